@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Asset Budget - Бюджет памяти текстур и загрузки по сценам
+Сопоставляет сцены с ассетами по ключам из PreloadScene.js и коду сцен
+(с их импортами), читает только заголовки файлов и считает для каждой сцены
+и для всей игры: RGBA память текстур, объём загрузки и длительность звука
+"""
+
+import sys
+import re
+import json
+import glob
+import struct
+import wave
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Ошибка: библиотека Pillow не установлена")
+    print("Установите: pip3 install Pillow")
+    sys.exit(1)
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+MB = 1024 * 1024
+
+# Пороги по умолчанию (МБ) - ориентир на слабые телефоны; 0 отключает проверку
+DEFAULT_BUDGETS = {
+    'scene_memory': 256,
+    'scene_download': 16,
+    'game_memory': 384,
+    'game_download': 64
+}
+
+IMAGE_EXTENSIONS = {'.png', '.webp', '.jpg', '.jpeg', '.gif'}
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.ogg', '.m4a'}
+VIDEO_EXTENSIONS = {'.mp4', '.webm'}
+
+# this.load.image('key', './assets/...') и аналоги
+LOAD_RE = re.compile(
+    r"this\.load\.(image|spritesheet|atlas|audio|video)\(\s*"
+    r"(['\"`])(.+?)\2\s*,\s*(['\"`])(.+?)\4"
+)
+FOR_RE = re.compile(r"for\s*\(\s*(?:let|var|const)\s+(\w+)\s*=\s*(\d+)\s*;\s*\1\s*(<=?)\s*(\d+)\s*;")
+TEMPLATE_VAR_RE = re.compile(r"\$\{\s*(\w+)\s*(?:([+-])\s*(\d+))?\s*\}")
+STRING_RE = re.compile(r"'([^'\n\\]*)'|\"([^\"\n\\]*)\"|`([^`\\]*)`")
+ASSET_PATH_RE = re.compile(r"(?:\./)?assets/[^'\"`\s)]+")
+SCENE_LIST_RE = re.compile(r"scene\s*:\s*\[([^\]]*)\]")
+IMPORT_RE = re.compile(r"^\s*import\s+(?:[^'\"]*?\s+from\s+)?['\"](\.[^'\"]+)['\"]", re.MULTILINE)
+DYNAMIC_IMPORT_RE = re.compile(r"\bimport\(\s*['\"](\.[^'\"]+)['\"]\s*\)")
+
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+}
+MP3_SAMPLE_RATES = {
+    1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    2.5: [11025, 12000, 8000]
+}
+
+
+def mp3_info(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Длительность MP3 по заголовкам фреймов (Layer III, в том числе VBR)
+
+    Аудиоданные не декодируются - обходятся только 4-байтовые заголовки.
+
+    Returns:
+        словарь duration / sample_rate / channels или None, если фреймов нет
+    """
+    data = path.read_bytes()
+    pos = 0
+
+    # Пропускаем ID3v2 тег: размер - syncsafe число
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    frames = samples = 0
+    sample_rate = channels = None
+
+    while pos + 4 <= len(data):
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0 or (b1 >> 1) & 0x03 != 0x01:
+            pos += 1
+            continue
+
+        version_bits = (b1 >> 3) & 0x03
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 0x03
+        if version_bits == 1 or bitrate_index in (0, 15) or rate_index == 3:
+            pos += 1
+            continue
+
+        version = {3: 1, 2: 2, 0: 2.5}[version_bits]
+        table = 1 if version == 1 else 2
+        bitrate = MP3_BITRATES[table][bitrate_index] * 1000
+        rate = MP3_SAMPLE_RATES[version][rate_index]
+        padding = (b2 >> 1) & 0x01
+        frame_samples = 1152 if version == 1 else 576
+
+        if sample_rate is None:
+            sample_rate = rate
+            channels = 1 if (b3 >> 6) == 0x03 else 2
+
+        frames += 1
+        samples += frame_samples
+        pos += frame_samples // 8 * bitrate // rate + padding
+
+    if not frames:
+        return None
+
+    return {'duration': samples / sample_rate, 'sample_rate': sample_rate, 'channels': channels}
+
+
+def wav_info(path: Path) -> Optional[Dict[str, Any]]:
+    """Длительность WAV из заголовка"""
+    with wave.open(str(path), 'rb') as f:
+        return {
+            'duration': f.getnframes() / f.getframerate(),
+            'sample_rate': f.getframerate(),
+            'channels': f.getnchannels()
+        }
+
+
+def mp4_info(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Длительность и размер кадра MP4 из боксов moov/mvhd и trak/tkhd
+
+    Файл обходится по заголовкам боксов (mdat пропускается через seek).
+    """
+    info: Dict[str, Any] = {}
+
+    def walk(f, end):
+        while f.tell() + 8 <= end:
+            start = f.tell()
+            size, box = struct.unpack('>I4s', f.read(8))
+            header = 8
+            if size == 1:
+                size = struct.unpack('>Q', f.read(8))[0]
+                header = 16
+            elif size == 0:
+                size = end - start
+            if size < header:
+                return
+
+            if box in (b'moov', b'trak'):
+                walk(f, start + size)
+            elif box == b'mvhd':
+                version = f.read(4)[0]
+                if version == 1:
+                    f.read(16)
+                    timescale, duration = struct.unpack('>IQ', f.read(12))
+                else:
+                    f.read(8)
+                    timescale, duration = struct.unpack('>II', f.read(8))
+                if timescale:
+                    info['duration'] = duration / timescale
+            elif box == b'tkhd':
+                # Ширина и высота - последние 8 байт бокса, числа 16.16
+                f.seek(start + size - 8)
+                width, height = struct.unpack('>II', f.read(8))
+                if width and height:
+                    info['width'], info['height'] = width >> 16, height >> 16
+
+            f.seek(start + size)
+
+    with open(path, 'rb') as f:
+        walk(f, path.stat().st_size)
+
+    return info or None
+
+
+def asset_record(path: Path, root: Path, source: str) -> Dict[str, Any]:
+    """
+    Описание одного ассета по заголовку файла
+
+    Args:
+        path: файл ассета
+        root: корень проекта (для относительного пути в отчёте)
+        source: 'preload' - загрузчик Phaser, 'dom' - <img>/Audio/видео в DOM
+
+    Память:
+      - картинки: width × height × 4 (RGBA текстура Phaser или декодированный <img>)
+      - звук загрузчика Phaser: декодируется Web Audio целиком в float32 PCM
+      - DOM звук и видео проигрываются потоком - считаем только загрузку
+    """
+    suffix = path.suffix.lower()
+    record: Dict[str, Any] = {
+        'path': path.relative_to(root).as_posix() if path.is_relative_to(root) else str(path),
+        'source': source,
+        'exists': path.exists(),
+        'download_bytes': 0,
+        'memory_bytes': 0
+    }
+
+    if not path.exists():
+        return record
+
+    record['download_bytes'] = path.stat().st_size
+
+    try:
+        if suffix in IMAGE_EXTENSIONS:
+            # Image.open читает только заголовок, пиксели не декодируются
+            with Image.open(path) as img:
+                width, height = img.size
+            record.update(kind='image', width=width, height=height, memory_bytes=width * height * 4)
+        elif suffix in AUDIO_EXTENSIONS:
+            audio = mp3_info(path) if suffix == '.mp3' else wav_info(path) if suffix == '.wav' else None
+            record['kind'] = 'audio'
+            if audio:
+                record['duration'] = round(audio['duration'], 2)
+                if source == 'preload':
+                    record['memory_bytes'] = int(audio['duration'] * audio['sample_rate']) * audio['channels'] * 4
+        elif suffix in VIDEO_EXTENSIONS:
+            video = mp4_info(path) if suffix == '.mp4' else None
+            record['kind'] = 'video'
+            if video:
+                record.update({k: round(v, 2) if k == 'duration' else v for k, v in video.items()})
+        else:
+            record['kind'] = 'other'
+    except Exception as e:
+        record['error'] = str(e)
+
+    return record
+
+
+def expand_template(text: str, loops: List[Tuple[int, str, int, int]], position: int) -> List[str]:
+    """
+    Раскрывает `photo_mem${i}` по ближайшему предшествующему циклу for по i
+
+    Returns:
+        список строк (исходная строка, если раскрыть нельзя)
+    """
+    match = TEMPLATE_VAR_RE.search(text)
+    if not match:
+        return [text]
+
+    var = match.group(1)
+    for loop_pos, loop_var, start, end in reversed(loops):
+        if loop_pos < position and loop_var == var:
+            offset = int(match.group(3) or 0) * (-1 if match.group(2) == '-' else 1)
+            return [TEMPLATE_VAR_RE.sub(str(value + offset), text, count=1) for value in range(start, end)]
+
+    return [text]
+
+
+def resolve_public(path_text: str, public_dir: Path) -> List[Path]:
+    """Путь из кода ('./assets/...') -> файлы в public/ (шаблоны раскрываются glob)"""
+    relative = path_text.split('assets/', 1)[1]
+    if '${' in relative:
+        pattern = TEMPLATE_VAR_RE.sub('*', relative)
+        return [Path(p) for p in sorted(glob.glob(str(public_dir / 'assets' / pattern)))]
+    return [public_dir / 'assets' / relative]
+
+
+def parse_preload(preload_path: Path, public_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Ключи загрузчика из PreloadScene.js
+
+    Returns:
+        {ключ: {'type': image/spritesheet/audio/..., 'path': Path}}
+    """
+    source = preload_path.read_text(encoding='utf-8')
+    loops = [(m.start(), m.group(1), int(m.group(2)), int(m.group(4)) + (1 if m.group(3) == '<=' else 0))
+             for m in FOR_RE.finditer(source)]
+
+    keys = {}
+    for match in LOAD_RE.finditer(source):
+        load_type, key, path_text = match.group(1), match.group(3), match.group(5)
+        for key_value, path_value in zip(expand_template(key, loops, match.start()),
+                                         expand_template(path_text, loops, match.start())):
+            if 'assets/' in path_value:
+                keys[key_value] = {'type': load_type, 'path': resolve_public(path_value, public_dir)[0]}
+
+    return keys
+
+
+def resolve_import(base: Path, spec: str) -> Optional[Path]:
+    """Относительный импорт -> файл (расширение можно не указывать, как в Vite)"""
+    target = (base.parent / spec).resolve()
+    for candidate in (target, target.with_name(target.name + '.js'),
+                      target.with_name(target.name + '.jsx'), target / 'index.js'):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def collect_references(entry: Path, keys: Dict[str, Dict[str, Any]],
+                       public_dir: Path) -> Tuple[set, set]:
+    """
+    Ассеты, которые использует файл и всё, что он импортирует
+
+    Ключ засчитывается, если строковый литерал совпадает с ключом загрузчика
+    (шаблон `comm_goal${n}` сопоставляется с ключами как маска). Пути
+    './assets/...' в коде - ассеты DOM (картинки оверлеев, Audio, видео),
+    в том числе файлы, которые уже есть в загрузчике.
+
+    Returns:
+        (множество ключей, множество путей DOM ассетов)
+    """
+    used_keys = set()
+    dom_paths = set()
+    visited = set()
+    queue = [entry]
+
+    while queue:
+        path = queue.pop()
+        if path in visited:
+            continue
+        visited.add(path)
+        # Вызов загрузчика - это ссылка на ключ, его путь DOM ассетом не считается
+        source = LOAD_RE.sub(lambda m: m.group(2) + m.group(3) + m.group(2), path.read_text(encoding='utf-8'))
+
+        for match in STRING_RE.finditer(source):
+            text = next(group for group in match.groups() if group is not None)
+            if 'assets/' in text:
+                # Литерал целиком - путь (в имени может быть пробел);
+                # в шаблонной строке с разметкой путей может быть несколько
+                whole = ASSET_PATH_RE.match(text) and not any(c in text for c in '\n<>"=')
+                for path_text in [text] if whole else ASSET_PATH_RE.findall(text):
+                    dom_paths.update(resolve_public(path_text, public_dir))
+            elif '${' in text:
+                mask = re.compile('^' + '.*'.join(re.escape(part) for part in TEMPLATE_VAR_RE.split(text)[::4]) + '$')
+                used_keys.update(key for key in keys if mask.match(key))
+            elif text in keys:
+                used_keys.add(text)
+
+        # Оверлеи подгружаются и через import() - они тоже часть сцены
+        for spec in IMPORT_RE.findall(source) + DYNAMIC_IMPORT_RE.findall(source):
+            target = resolve_import(path, spec)
+            if target:
+                queue.append(target)
+
+    return used_keys, dom_paths
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Суммы по набору ассетов"""
+    return {
+        'assets': len(records),
+        'download_bytes': sum(r['download_bytes'] for r in records),
+        'texture_bytes': sum(r['memory_bytes'] for r in records if r.get('kind') == 'image'),
+        'audio_decoded_bytes': sum(r['memory_bytes'] for r in records if r.get('kind') == 'audio'),
+        'audio_seconds': round(sum(r.get('duration', 0) for r in records if r.get('kind') == 'audio'), 2),
+        'video_seconds': round(sum(r.get('duration', 0) for r in records if r.get('kind') == 'video'), 2)
+    }
+
+
+def scene_order(main_path: Path) -> List[str]:
+    """Порядок сцен из конфига игры (scene: [BootScene, PreloadScene, ...])"""
+    if not main_path.exists():
+        return []
+    match = SCENE_LIST_RE.search(main_path.read_text(encoding='utf-8'))
+    return [name.strip() for name in match.group(1).split(',') if name.strip()] if match else []
+
+
+def build_report(root: Path) -> Dict[str, Any]:
+    """
+    Строит отчёт по всем сценам из src/scenes
+
+    Phaser не выгружает текстуры и декодированный звук между сценами, поэтому
+    всё загруженное в PreloadScene резидентно до конца игры. Пиковая память
+    сцены = резидентные ассеты загрузчика (для сцен после PreloadScene)
+    + декодированные DOM картинки сцены (верхняя оценка - как будто все
+    оверлеи сцены открыты). Загрузка сцены - то, что она
+    догружает сама (DOM ассеты вне загрузчика); у PreloadScene - весь набор
+    загрузчика.
+    """
+    public_dir = root / 'public'
+    scenes_dir = root / 'src' / 'scenes'
+    main_path = root / 'src' / 'main.js'
+    keys = parse_preload(scenes_dir / 'PreloadScene.js', public_dir)
+    preload_paths = {info['path'] for info in keys.values()}
+
+    order = scene_order(main_path)
+    before_preload = set(order[:order.index('PreloadScene')]) if 'PreloadScene' in order else set()
+
+    cache: Dict[Tuple[Path, str], Dict[str, Any]] = {}
+
+    def record(path: Path, source: str) -> Dict[str, Any]:
+        if (path, source) not in cache:
+            cache[(path, source)] = asset_record(path, root, source)
+        return cache[(path, source)]
+
+    def dom_download(records):
+        # Файлы загрузчика уже в кэше браузера - повторно не скачиваются
+        return sum(r['download_bytes'] for r in records if root / r['path'] not in preload_paths)
+
+    preload_records = [dict(record(info['path'], 'preload'), key=key) for key, info in keys.items()]
+    resident = summarize(preload_records)
+    resident_memory = resident['texture_bytes'] + resident['audio_decoded_bytes']
+
+    scenes = {}
+    used_by_scenes = set()
+    dom_by_scenes = set()
+    for scene_path in sorted(scenes_dir.glob('*.js')):
+        name = scene_path.stem
+        used_keys, dom_paths = collect_references(scene_path, keys, public_dir)
+        key_records = [dict(record(keys[key]['path'], 'preload'), key=key) for key in sorted(used_keys)]
+        dom_records = [record(path, 'dom') for path in sorted(dom_paths)]
+
+        if name != 'PreloadScene':
+            used_by_scenes.update(used_keys)
+            dom_by_scenes.update(dom_paths)
+
+        totals = summarize(key_records + dom_records)
+        totals['peak_memory_bytes'] = ((0 if name in before_preload else resident_memory)
+                                       + summarize(dom_records)['texture_bytes'])
+        totals['scene_download_bytes'] = (resident['download_bytes'] if name == 'PreloadScene'
+                                          else dom_download(dom_records))
+
+        scenes[name] = {'totals': totals, 'assets': key_records + dom_records}
+
+    # Вся игра: весь набор загрузчика плюс всё, что достижимо из main.js
+    game_dom = collect_references(main_path, keys, public_dir)[1] if main_path.exists() else set()
+    game_dom_records = [record(path, 'dom') for path in sorted(game_dom)]
+    game = summarize(preload_records + [r for r in game_dom_records if root / r['path'] not in preload_paths])
+    game['resident_memory_bytes'] = resident_memory
+    game['peak_memory_bytes'] = max([s['totals']['peak_memory_bytes'] for s in scenes.values()] + [resident_memory])
+
+    unused = sorted(key for key in keys if key not in used_by_scenes)
+    return {
+        'game': game,
+        'scenes': scenes,
+        # Загрузчик декодирует их в текстуры/PCM, а сцены берут те же файлы через DOM
+        'preload_keys_used_only_by_dom': [key for key in unused if keys[key]['path'] in dom_by_scenes],
+        'unused_preload_keys': [key for key in unused if keys[key]['path'] not in dom_by_scenes],
+        'missing_files': sorted({r['path'] for r in cache.values() if not r['exists']})
+    }
+
+
+def check_budgets(report: Dict[str, Any], budgets: Dict[str, float]) -> List[str]:
+    """Список нарушений порогов (пороги в МБ, 0 - без проверки)"""
+    failures = []
+
+    def check(limit_name, label, value):
+        limit = budgets.get(limit_name) or 0
+        if limit and value > limit * MB:
+            failures.append(f"{label}: {value / MB:.1f} МБ > {limit:g} МБ")
+
+    for name, scene in report['scenes'].items():
+        check('scene_memory', f"{name} пиковая память", scene['totals']['peak_memory_bytes'])
+        check('scene_download', f"{name} загрузка", scene['totals']['scene_download_bytes'])
+
+    check('game_memory', "Игра пиковая память", report['game']['peak_memory_bytes'])
+    check('game_download', "Игра загрузка", report['game']['download_bytes'])
+    return failures
+
+
+def print_report(report: Dict[str, Any]):
+    """Печатает таблицу по сценам и итог по игре"""
+    print(f"\n{'Сцена':<16}{'ассетов':>9}{'текстуры':>11}{'звук PCM':>11}{'звук, с':>9}"
+          f"{'загрузка':>11}{'пик памяти':>12}")
+    print("-" * 79)
+    for name, scene in report['scenes'].items():
+        t = scene['totals']
+        print(f"{name:<16}{t['assets']:>9}{t['texture_bytes'] / MB:>9.1f}МБ{t['audio_decoded_bytes'] / MB:>9.1f}МБ"
+              f"{t['audio_seconds']:>9.1f}{t['scene_download_bytes'] / MB:>9.1f}МБ{t['peak_memory_bytes'] / MB:>10.1f}МБ")
+
+    game = report['game']
+    print("-" * 79)
+    print(f"🎮 Вся игра: {game['assets']} ассетов, загрузка {game['download_bytes'] / MB:.1f} МБ")
+    print(f"   🖼️  Текстуры и картинки: {game['texture_bytes'] / MB:.1f} МБ RGBA")
+    print(f"   🔊 Звук: {game['audio_seconds']:.0f} с, декодировано Web Audio {game['audio_decoded_bytes'] / MB:.1f} МБ")
+    print(f"   🎬 Видео: {game['video_seconds']:.0f} с")
+    print(f"   🧠 Резидентно после PreloadScene: {game['resident_memory_bytes'] / MB:.1f} МБ, "
+          f"пик: {game['peak_memory_bytes'] / MB:.1f} МБ")
+
+    # Самые дорогие текстуры - первые кандидаты на уменьшение
+    images = {}
+    for scene in report['scenes'].values():
+        for asset in scene['assets']:
+            if asset.get('kind') == 'image':
+                images[asset['path']] = asset
+    heaviest = sorted(images.values(), key=lambda a: a['memory_bytes'], reverse=True)[:5]
+    if heaviest:
+        print("   📈 Самые тяжёлые картинки:")
+        for asset in heaviest:
+            print(f"      {asset['memory_bytes'] / MB:6.1f} МБ  {asset['width']}×{asset['height']}  {asset['path']}")
+
+    if report['preload_keys_used_only_by_dom']:
+        print(f"   ⚠️  Загрузчик декодирует, а сцены используют только через DOM: "
+              f"{', '.join(report['preload_keys_used_only_by_dom'])}")
+    if report['unused_preload_keys']:
+        print(f"   ⚠️  Загружаются, но не используются сценами: {', '.join(report['unused_preload_keys'])}")
+    if report['missing_files']:
+        print(f"   ⚠️  Файлы не найдены: {', '.join(report['missing_files'])}")
+
+
+def main():
+    """Главная функция с обработкой аргументов командной строки"""
+
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print(f"""
+📊 Asset Budget - бюджет памяти текстур и загрузки по сценам
+
+Использование:
+  python3 asset_budget.py [корень проекта]        # Отчёт + asset_budget.json
+
+Параметры:
+  --output, -o            Путь к JSON отчёту (по умолчанию <корень>/asset_budget.json)
+  --max-scene-memory      Пиковая память сцены, МБ (по умолчанию {DEFAULT_BUDGETS['scene_memory']})
+  --max-scene-download    Догрузка одной сцены, МБ (по умолчанию {DEFAULT_BUDGETS['scene_download']})
+  --max-game-memory       Пиковая память игры, МБ (по умолчанию {DEFAULT_BUDGETS['game_memory']})
+  --max-game-download     Загрузка всей игры, МБ (по умолчанию {DEFAULT_BUDGETS['game_download']})
+
+  Порог 0 отключает проверку. При превышении код выхода 1 - можно ставить
+  перед сборкой: python3 tools/asset_budget.py && npm run build
+
+Примеры:
+  python3 tools/asset_budget.py
+  python3 tools/asset_budget.py --max-scene-memory 128 -o dist/asset_budget.json
+""")
+        sys.exit(0)
+
+    root = PROJECT_ROOT
+    output_path = None
+    budgets = dict(DEFAULT_BUDGETS)
+    budget_flags = {f"--max-{name.replace('_', '-')}": name for name in DEFAULT_BUDGETS}
+
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+
+        if arg in ['--output', '-o'] and i + 1 < len(sys.argv):
+            output_path = Path(sys.argv[i + 1])
+            i += 2
+        elif arg in budget_flags and i + 1 < len(sys.argv):
+            budgets[budget_flags[arg]] = float(sys.argv[i + 1])
+            i += 2
+        elif not arg.startswith('-'):
+            root = Path(arg).resolve()
+            i += 1
+        else:
+            i += 1
+
+    if not (root / 'src' / 'scenes' / 'PreloadScene.js').exists():
+        print(f"❌ Не найден src/scenes/PreloadScene.js в {root}")
+        sys.exit(1)
+
+    report = build_report(root)
+    report['budgets_mb'] = budgets
+    report['failures'] = check_budgets(report, budgets)
+
+    print_report(report)
+
+    output_path = output_path or root / 'asset_budget.json'
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n📄 Отчёт: {output_path}")
+
+    if report['failures']:
+        print("\n❌ Бюджет превышен:")
+        for failure in report['failures']:
+            print(f"   {failure}")
+        sys.exit(1)
+
+    print("✅ Все сцены укладываются в бюджет")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Asset Server - Локальный dev-сервер ассетов с генерацией на лету
+Отдаёт комнаты (RoomGenerator), .tsx файлы и встроенные карты по параметрам запроса,
+кэширует результаты в памяти (LRU), поддерживает ETag/304 и gzip.
+Vite проксирует на него /dev-assets (см. vite.config.js).
+"""
+
+import sys
+import json
+import gzip
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Callable, List
+from urllib.parse import urlsplit, parse_qsl
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Ошибка: библиотека Pillow не установлена")
+    print("Установите: pip3 install Pillow")
+    sys.exit(1)
+
+from room_generator import generate_bedroom, generate_kitchen, generate_bathroom
+from tileset_generator import build_tileset_xml
+from convert_to_embedded import embed_tilesets, TILESET_MAPPING
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = PROJECT_ROOT / "public" / "assets"
+
+ROOM_GENERATORS = {
+    'bedroom': (generate_bedroom, 20, 15),
+    'kitchen': (generate_kitchen, 18, 12),
+    'bathroom': (generate_bathroom, 12, 10),
+}
+
+# Изображения tilesets, которые генераторы room_generator открывают для каждой комнаты
+# (tilecount, firstgid и размеры изображения в ответе /room берутся из них)
+ROOM_TILESETS = {
+    'bedroom': ('tilesets/floor_bedroom.png', 'tilesets/room_structure.png', 'furniture/furniture_props.png'),
+    'kitchen': ('tilesets/floor_kitchen.png', 'tilesets/room_structure.png', 'furniture/furniture_props.png'),
+    'bathroom': ('tilesets/floor_bathroom.png', 'tilesets/room_structure.png', 'furniture/furniture_props.png'),
+}
+
+# Меньше этого размера gzip не окупается
+GZIP_MIN_SIZE = 512
+
+MAX_REQUEST_LINE = 8192
+
+
+class RequestError(Exception):
+    """Ошибка запроса с HTTP статусом"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RenderedAsset:
+    """Готовый ответ: тело, gzip-версия и ETag считаются один раз"""
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+
+
+class LRUCache:
+    """Небольшой LRU кэш готовых ответов"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._items: 'OrderedDict[Tuple, RenderedAsset]' = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[RenderedAsset]:
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key: Tuple, item: RenderedAsset):
+        self._items[key] = item
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+
+def resolve_asset(relative: str) -> Path:
+    """Путь внутри public/assets (выход за пределы запрещён)"""
+    if not relative:
+        raise RequestError(400, "не указан путь к файлу")
+
+    path = (ASSETS_DIR / relative).resolve()
+    if not path.is_relative_to(ASSETS_DIR.resolve()):
+        raise RequestError(403, f"путь вне public/assets: {relative}")
+    if not path.is_file():
+        raise RequestError(404, f"файл не найден: {relative}")
+    return path
+
+
+def int_param(params: Dict[str, str], name: str, default: int) -> int:
+    """Целочисленный параметр запроса"""
+    value = params.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise RequestError(400, f"параметр {name} должен быть числом: {value}")
+
+
+def render_room(params: Dict[str, str]) -> RenderedAsset:
+    """GET /room?type=bedroom&width=20&height=15 - JSON карта комнаты"""
+    room_type = params.get('type', 'bedroom').lower()
+    if room_type not in ROOM_GENERATORS:
+        raise RequestError(400, f"неизвестный тип комнаты: {room_type} "
+                                f"(доступны {', '.join(ROOM_GENERATORS)})")
+
+    generator, default_width, default_height = ROOM_GENERATORS[room_type]
+    width = int_param(params, 'width', default_width)
+    height = int_param(params, 'height', default_height)
+    if not (3 <= width <= 1000 and 3 <= height <= 1000):
+        raise RequestError(400, "размер комнаты должен быть от 3 до 1000 тайлов")
+
+    room = generator(None, width, height)
+    # Пути к tilesets считаем так, будто карта лежит в public/assets/tilemaps
+    tilemap = room.to_json(ASSETS_DIR / "tilemaps" / f"generated_{room_type}.json")
+    body = json.dumps(tilemap, ensure_ascii=False).encode('utf-8')
+    return RenderedAsset(body, 'application/json; charset=utf-8')
+
+
+def render_tileset(params: Dict[str, str]) -> RenderedAsset:
+    """GET /tileset?image=tilesets/floor_bedroom.png&tile_size=16 - .tsx файл"""
+    png_path = resolve_asset(params.get('image', ''))
+    tile_size = int_param(params, 'tile_size', 16)
+    tile_width = int_param(params, 'tile_width', tile_size)
+    tile_height = int_param(params, 'tile_height', tile_size)
+    spacing = int_param(params, 'spacing', 0)
+    margin = int_param(params, 'margin', 0)
+    if tile_width <= 0 or tile_height <= 0:
+        raise RequestError(400, "размер тайла должен быть положительным")
+    if spacing < 0 or margin < 0:
+        raise RequestError(400, "spacing и margin не могут быть отрицательными")
+
+    # Хотя бы один тайл должен помещаться в изображение с учётом margin
+    with Image.open(png_path) as img:
+        img_width, img_height = img.size
+    if img_width - 2 * margin < tile_width or img_height - 2 * margin < tile_height:
+        raise RequestError(400, f"тайл {tile_width}×{tile_height} с margin {margin} "
+                                f"не помещается в изображение {img_width}×{img_height}")
+
+    xml_string, _ = build_tileset_xml(
+        png_path, png_path.with_suffix('.tsx'), tile_width, tile_height,
+        spacing, margin, params.get('name') or None
+    )
+    return RenderedAsset(xml_string.encode('utf-8'), 'application/xml; charset=utf-8')
+
+
+def render_embedded_map(params: Dict[str, str]) -> RenderedAsset:
+    """GET /map?path=tilemaps/room.json - карта со встроенными tilesets"""
+    map_path = resolve_asset(params.get('path', ''))
+
+    with open(map_path, 'r', encoding='utf-8') as f:
+        map_data = json.load(f)
+
+    map_data['tilesets'] = embed_tilesets(map_data.get('tilesets', []), map_path.parent)
+    body = json.dumps(map_data, ensure_ascii=False).encode('utf-8')
+    return RenderedAsset(body, 'application/json; charset=utf-8')
+
+
+def file_stamp(path: Path) -> Tuple:
+    """Версия файла для ключа кэша: меняется при любой правке"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return (str(path), None, None)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=256)
+def map_dependencies(map_path: Path, map_stamp: Tuple) -> Tuple[Path, ...]:
+    """
+    Изображения, которые embed_tilesets читает для карты
+
+    Кэшируется по версии файла карты, поэтому JSON разбирается только после правки.
+    """
+    with open(map_path, 'r', encoding='utf-8') as f:
+        map_data = json.load(f)
+
+    dependencies = []
+    for tileset in map_data.get('tilesets', []):
+        tsx_name = Path(tileset['source']).stem if 'source' in tileset else None
+        if tsx_name in TILESET_MAPPING:
+            dependencies.append(map_path.parent / TILESET_MAPPING[tsx_name][1])
+    return tuple(dependencies)
+
+
+def room_sources(params: Dict[str, str]) -> List[Path]:
+    """Исходники /room: изображения tilesets комнаты"""
+    room_type = params.get('type', 'bedroom').lower()
+    return [ASSETS_DIR / image for image in ROOM_TILESETS.get(room_type, ())]
+
+
+def tileset_sources(params: Dict[str, str]) -> List[Path]:
+    """Исходники /tileset: PNG листа"""
+    return [resolve_asset(params.get('image', ''))]
+
+
+def map_sources(params: Dict[str, str]) -> List[Path]:
+    """Исходники /map: файл карты и встраиваемые изображения tilesets"""
+    map_path = resolve_asset(params.get('path', ''))
+    return [map_path, *map_dependencies(map_path, file_stamp(map_path))]
+
+
+ROUTES: Dict[str, Callable[[Dict[str, str]], RenderedAsset]] = {
+    '/room': render_room,
+    '/tileset': render_tileset,
+    '/map': render_embedded_map,
+}
+
+# Маршруты, читающие файлы с диска: их версии входят в ключ кэша,
+# чтобы после правки карты или PNG обновление страницы получало новый ответ
+SOURCE_FILES: Dict[str, Callable[[Dict[str, str]], List[Path]]] = {
+    '/room': room_sources,
+    '/tileset': tileset_sources,
+    '/map': map_sources,
+}
+
+
+def source_stamps(path: str, params: Dict[str, str]) -> Tuple:
+    """Версии исходных файлов маршрута (пусто для генерируемых ответов)"""
+    sources = SOURCE_FILES.get(path)
+    return tuple(file_stamp(source) for source in sources(params)) if sources else ()
+
+
+STATUS_TEXT = {
+    200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 403: 'Forbidden',
+    404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error',
+}
+
+
+class AssetServer:
+    """HTTP/1.1 сервер на asyncio; тяжёлая работа (Pillow, JSON) уходит в пул потоков"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765,
+                 cache_size: int = 64, workers: int = 4):
+        self.host = host
+        self.port = port
+        self.cache = LRUCache(cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # Одинаковые запросы, пришедшие одновременно, ждут одну генерацию
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+
+    async def get_asset(self, path: str, params: Dict[str, str]) -> RenderedAsset:
+        """Взять ответ из кэша или сгенерировать его в пуле потоков"""
+        if params.get('nocache'):
+            params = {k: v for k, v in params.items() if k != 'nocache'}
+            self.cache.clear()
+
+        loop = asyncio.get_running_loop()
+        stamps = await loop.run_in_executor(self.executor, source_stamps, path, params)
+        key = (path, tuple(sorted(params.items())), stamps)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = loop.run_in_executor(self.executor, ROUTES[path], params)
+        self._pending[key] = future
+        try:
+            asset = await future
+        finally:
+            del self._pending[key]
+
+        self.cache.put(key, asset)
+        return asset
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Обслуживает одно соединение (с поддержкой keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                if len(request_line) > MAX_REQUEST_LINE:
+                    await self.send(writer, 400, b'request line too long', 'text/plain', keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.send(writer, 400, b'bad request line', 'text/plain', keep_alive=False)
+                    break
+
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                await self.respond(writer, method, target, headers, keep_alive)
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer: asyncio.StreamWriter, method: str, target: str,
+                      headers: Dict[str, str], keep_alive: bool):
+        """Формирует ответ на один запрос"""
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+
+        if method not in ('GET', 'HEAD'):
+            await self.send(writer, 405, b'only GET/HEAD', 'text/plain', keep_alive)
+            return
+
+        if url.path not in ROUTES:
+            body = ('routes: ' + ', '.join(ROUTES)).encode('utf-8')
+            await self.send(writer, 404, body, 'text/plain; charset=utf-8', keep_alive)
+            return
+
+        try:
+            asset = await self.get_asset(url.path, params)
+        except RequestError as e:
+            await self.send(writer, e.status, str(e).encode('utf-8'), 'text/plain; charset=utf-8', keep_alive)
+            print(f"⚠️  {e.status} {target}: {e}")
+            return
+        except Exception as e:
+            await self.send(writer, 500, repr(e).encode('utf-8'), 'text/plain; charset=utf-8', keep_alive)
+            print(f"❌ 500 {target}: {e!r}")
+            return
+
+        if asset.etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            await self.send(writer, 304, b'', None, keep_alive, {'ETag': asset.etag})
+            return
+
+        extra = {'ETag': asset.etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        body = asset.body
+        if asset.gzipped is not None and 'gzip' in headers.get('accept-encoding', ''):
+            body = asset.gzipped
+            extra['Content-Encoding'] = 'gzip'
+
+        await self.send(writer, 200, body, asset.content_type, keep_alive, extra,
+                        head_only=(method == 'HEAD'))
+
+    async def send(self, writer: asyncio.StreamWriter, status: int, body: bytes,
+                   content_type: Optional[str], keep_alive: bool,
+                   extra_headers: Optional[Dict[str, str]] = None, head_only: bool = False):
+        """Отправить HTTP ответ"""
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        for name, value in (extra_headers or {}).items():
+            lines.append(f"{name}: {value}")
+
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head_only and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self):
+        """Запуск сервера до Ctrl+C"""
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+
+        print(f"🚀 Asset server: http://{self.host}:{self.port}")
+        print(f"   📁 Ассеты: {ASSETS_DIR}")
+        print(f"   🔗 Маршруты: {', '.join(ROUTES)}")
+
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """Главная функция с обработкой аргументов командной строки"""
+
+    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+        print("""
+🚀 Asset Server - dev-сервер ассетов с генерацией на лету
+
+Использование:
+  python3 asset_server.py [--port 8765] [--host 127.0.0.1]
+
+Параметры:
+  --port, -p           Порт (по умолчанию 8765)
+  --host               Адрес (по умолчанию 127.0.0.1)
+  --cache              Размер LRU кэша в ответах (по умолчанию 64)
+  --workers, -j        Потоков для генерации (по умолчанию 4)
+
+Маршруты (через Vite: /dev-assets/...):
+  /room?type=bedroom&width=20&height=15        Комната из RoomGenerator
+  /tileset?image=tilesets/floor_bedroom.png    .tsx (tile_size, spacing, margin, name)
+  /map?path=tilemaps/room.json                 Карта со встроенными tilesets
+
+  Карты и PNG перечитываются после правки автоматически (по mtime и размеру);
+  nocache=1 сбрасывает весь кэш (например, после правки кода генераторов).
+""")
+        sys.exit(0)
+
+    kwargs = {
+        'host': '127.0.0.1',
+        'port': 8765,
+        'cache_size': 64,
+        'workers': 4
+    }
+
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+
+        if arg in ['--port', '-p'] and i + 1 < len(sys.argv):
+            kwargs['port'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--host' and i + 1 < len(sys.argv):
+            kwargs['host'] = sys.argv[i + 1]
+            i += 2
+        elif arg == '--cache' and i + 1 < len(sys.argv):
+            kwargs['cache_size'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg in ['--workers', '-j'] and i + 1 < len(sys.argv):
+            kwargs['workers'] = int(sys.argv[i + 1])
+            i += 2
+        else:
+            i += 1
+
+    try:
+        asyncio.run(AssetServer(**kwargs).serve())
+    except KeyboardInterrupt:
+        print("\n👋 Сервер остановлен")
+
+
+if __name__ == '__main__':
+    main()
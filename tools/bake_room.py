@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Room Baker - Запекание статичных слоёв карты в готовое изображение
+Склеивает слои Floor / Walls / Decoration в одну картинку (или сетку кусков),
+чтобы Phaser рисовал один спрайт вместо тысяч тайлов каждый кадр
+"""
+
+import sys
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from xml.etree.ElementTree import parse as parse_xml
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Ошибка: библиотека Pillow не установлена")
+    print("Установите: pip3 install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Ошибка: библиотека numpy не установлена")
+    print("Установите: pip3 install numpy")
+    sys.exit(1)
+
+from tile_utils import (FLIPPED_HORIZONTALLY, FLIPPED_VERTICALLY, FLIPPED_DIAGONALLY, GID_MASK,
+                        slice_tiles)
+
+
+DEFAULT_LAYERS = ["Floor", "Walls", "Decoration"]
+
+# Сколько пикселей обрабатываем за один блок строк (~64 МБ RGBA)
+BLOCK_PIXELS = 16 * 1024 * 1024
+
+
+def resolve_tilesets(map_data: Dict[str, Any], map_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Приводит tilesets карты к единому виду (встроенные и внешние .tsx)
+
+    Args:
+        map_data: загруженная JSON карта
+        map_dir: директория карты (относительно неё заданы пути)
+
+    Returns:
+        список словарей firstgid / image / tilewidth / tileheight / columns /
+        tilecount / spacing / margin, отсортированный по firstgid
+    """
+    resolved = []
+
+    for tileset in map_data.get('tilesets', []):
+        firstgid = tileset['firstgid']
+
+        if 'source' in tileset:
+            # Внешний .tsx - читаем параметры из XML
+            tsx_path = map_dir / tileset['source']
+            if not tsx_path.exists():
+                print(f"   ⚠️  Tileset не найден: {tsx_path}")
+                continue
+
+            root = parse_xml(tsx_path).getroot()
+            image = root.find('image')
+            if image is None:
+                print(f"   ⚠️  В {tsx_path.name} нет <image>, пропускаем")
+                continue
+
+            resolved.append({
+                "firstgid": firstgid,
+                "name": root.get('name', tsx_path.stem),
+                "image": tsx_path.parent / image.get('source'),
+                "tilewidth": int(root.get('tilewidth')),
+                "tileheight": int(root.get('tileheight')),
+                "columns": int(root.get('columns', 0)),
+                "tilecount": int(root.get('tilecount', 0)),
+                "spacing": int(root.get('spacing', 0)),
+                "margin": int(root.get('margin', 0)),
+            })
+        else:
+            resolved.append({
+                "firstgid": firstgid,
+                "name": tileset.get('name', 'unnamed'),
+                "image": map_dir / tileset['image'],
+                "tilewidth": tileset['tilewidth'],
+                "tileheight": tileset['tileheight'],
+                "columns": tileset.get('columns', 0),
+                "tilecount": tileset.get('tilecount', 0),
+                "spacing": tileset.get('spacing', 0),
+                "margin": tileset.get('margin', 0),
+            })
+
+    resolved.sort(key=lambda ts: ts['firstgid'])
+    return resolved
+
+
+class TilesetCache:
+    """
+    Кэш нарезанных tilesets
+
+    Каждое изображение декодируется и режется на тайлы ровно один раз;
+    результат - массив (tilecount, tile_h, tile_w, 4) uint8.
+    Уменьшенные копии (scale > 1) считаются из уже нарезанных тайлов
+    и тоже кэшируются.
+    """
+
+    def __init__(self):
+        self._tiles: Dict[Tuple, np.ndarray] = {}
+
+    def get(self, tileset: Dict[str, Any], scale: int = 1) -> np.ndarray:
+        """Получить массив тайлов для tileset (с нарезкой при первом обращении)"""
+        key = (
+            str(Path(tileset['image']).resolve()),
+            tileset['tilewidth'], tileset['tileheight'],
+            tileset['spacing'], tileset['margin'], scale,
+        )
+
+        if key not in self._tiles:
+            if scale == 1:
+                self._tiles[key] = self._slice(tileset)
+            else:
+                self._tiles[key] = downsample_tiles(self.get(tileset), scale)
+
+        return self._tiles[key]
+
+    @staticmethod
+    def _slice(tileset: Dict[str, Any]) -> np.ndarray:
+        """Разрезать изображение tileset на тайлы"""
+        with Image.open(tileset['image']) as img:
+            pixels = np.asarray(img.convert('RGBA'))
+
+        return slice_tiles(pixels, tileset['tilewidth'], tileset['tileheight'],
+                           tileset['spacing'], tileset['margin'])
+
+
+def downsample_tiles(tiles: np.ndarray, scale: int) -> np.ndarray:
+    """
+    Уменьшает тайлы в scale раз усреднением по площади
+
+    Цвет усредняется с весом по альфе, чтобы прозрачные пиксели
+    не затемняли края. Размер тайла должен делиться на scale.
+    """
+    count, tile_h, tile_w = tiles.shape[:3]
+    blocks = tiles.reshape(count, tile_h // scale, scale, tile_w // scale, scale, 4).astype(np.float32)
+
+    alpha = blocks[..., 3:4]
+    alpha_sum = alpha.sum(axis=(2, 4))
+    rgb_sum = (blocks[..., :3] * alpha).sum(axis=(2, 4))
+
+    result = np.empty((count, tile_h // scale, tile_w // scale, 4), dtype=np.float32)
+    result[..., :3] = np.divide(rgb_sum, alpha_sum, out=np.zeros_like(rgb_sum), where=alpha_sum > 0)
+    result[..., 3:4] = alpha_sum / (scale * scale)
+    return np.clip(np.rint(result), 0, 255).astype(np.uint8)
+
+
+def apply_flips(tile: np.ndarray, raw_gid: int) -> np.ndarray:
+    """Применить флаги отражения Tiled к одному тайлу (H, W, 4)"""
+    if raw_gid & FLIPPED_DIAGONALLY:
+        tile = tile.transpose(1, 0, 2)
+    if raw_gid & FLIPPED_HORIZONTALLY:
+        tile = tile[:, ::-1]
+    if raw_gid & FLIPPED_VERTICALLY:
+        tile = tile[::-1]
+    return tile
+
+
+def build_palette(raw_gids: np.ndarray, tilesets: List[Dict[str, Any]],
+                  cache: TilesetCache, tile_w: int, tile_h: int, scale: int = 1) -> np.ndarray:
+    """
+    Собирает тайлы для набора уникальных GID (с флагами отражения)
+
+    Args:
+        raw_gids: уникальные GID как в данных слоя (могут содержать флаги)
+        tilesets: результат resolve_tilesets
+        cache: кэш нарезанных tilesets
+        tile_w, tile_h: размер тайла карты (уже уменьшенный в scale раз)
+        scale: во сколько раз уменьшены тайлы
+
+    Returns:
+        массив (len(raw_gids), tile_h, tile_w, 4) uint8; GID 0 и неизвестные
+        GID дают прозрачный тайл
+    """
+    palette = np.zeros((len(raw_gids), tile_h, tile_w, 4), dtype=np.uint8)
+    firstgids = np.array([ts['firstgid'] for ts in tilesets], dtype=np.int64)
+    missing = 0
+    oversized = set()
+
+    for i, raw_gid in enumerate(int(g) for g in raw_gids):
+        gid = raw_gid & GID_MASK
+        if gid == 0:
+            continue
+
+        ts_index = int(np.searchsorted(firstgids, gid, side='right')) - 1
+        if ts_index < 0:
+            missing += 1
+            continue
+
+        tiles = cache.get(tilesets[ts_index], scale)
+        local_id = gid - tilesets[ts_index]['firstgid']
+        if local_id >= len(tiles):
+            missing += 1
+            continue
+
+        tile = apply_flips(tiles[local_id], raw_gid)
+        # Tiled рисует тайлы крупнее клетки от её левого нижнего угла с выходом
+        # вверх и вправо; стопки тайлов здесь склеиваются по клеткам, поэтому
+        # выступающая часть обрезается (с предупреждением ниже)
+        if tile.shape[0] > tile_h or tile.shape[1] > tile_w:
+            oversized.add(tilesets[ts_index]['name'])
+        h = min(tile.shape[0], tile_h)
+        w = min(tile.shape[1], tile_w)
+        palette[i, tile_h - h:, :w] = tile[tile.shape[0] - h:, :w]
+
+    if missing:
+        print(f"   ⚠️  GID без tileset: {missing} (нарисованы прозрачными)")
+    if oversized:
+        print(f"   ⚠️  Тайлы крупнее клетки карты обрезаны до клетки: {', '.join(sorted(oversized))}")
+        print(f"      В Tiled они выходят за клетку вверх - запечённое изображение будет отличаться")
+
+    return palette
+
+
+def composite_stacks(stacks: np.ndarray, palettes: List[np.ndarray],
+                     opacities: List[float]) -> np.ndarray:
+    """
+    Накладывает слои друг на друга (alpha "over") для каждой уникальной стопки тайлов
+
+    Args:
+        stacks: (N, L) индексы в палитрах слоёв для каждой стопки
+        palettes: палитры тайлов каждого слоя, (U_l, H, W, 4) uint8
+        opacities: прозрачность каждого слоя
+
+    Returns:
+        (N, H, W, 4) uint8 - готовые склеенные тайлы
+    """
+    tile_h, tile_w = palettes[0].shape[1:3]
+    # Считаем в premultiplied alpha, так "over" - это одно умножение-сложение
+    result = np.zeros((len(stacks), tile_h, tile_w, 4), dtype=np.float32)
+
+    for layer_index, (palette, opacity) in enumerate(zip(palettes, opacities)):
+        src = palette[stacks[:, layer_index]].astype(np.float32) / 255.0
+        src[..., 3] *= opacity
+        src[..., :3] *= src[..., 3:4]
+        result = src + result * (1.0 - src[..., 3:4])
+
+    alpha = result[..., 3:4]
+    rgb = np.divide(result[..., :3], alpha, out=np.zeros_like(result[..., :3]), where=alpha > 0)
+    result[..., :3] = rgb
+    return np.clip(np.rint(result * 255.0), 0, 255).astype(np.uint8)
+
+
+def compose_stacks(map_data: Dict[str, Any], map_dir: Path, layer_names: List[str],
+                   cache: Optional[TilesetCache] = None,
+                   scale: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Сводит выбранные слои карты к сетке индексов уникальных стопок тайлов
+
+    Одинаковые комбинации тайлов (например, пол + стена) склеиваются один раз,
+    дальше итоговое изображение собирается простым копированием готовых тайлов.
+
+    При scale > 1 все тайлы берутся уменьшенными (для превью), полноразмерное
+    изображение при этом не строится.
+
+    Returns:
+        (grid, tiles): grid - (height, width) индексы в tiles,
+        tiles - (N, tile_h / scale, tile_w / scale, 4) uint8 склеенные тайлы
+    """
+    cache = cache or TilesetCache()
+    width = map_data['width']
+    height = map_data['height']
+    tile_w = map_data['tilewidth'] // scale
+    tile_h = map_data['tileheight'] // scale
+
+    tilesets = resolve_tilesets(map_data, map_dir)
+    layers = [
+        layer for layer in map_data.get('layers', [])
+        if layer.get('type') == 'tilelayer' and layer.get('name') in layer_names
+        and layer.get('visible', True)
+    ]
+
+    if not layers:
+        empty = np.zeros((1, tile_h, tile_w, 4), dtype=np.uint8)
+        return np.zeros((height, width), dtype=np.int32), empty
+
+    palettes = []
+    opacities = []
+    key = np.zeros(width * height, dtype=np.int64)
+    stacks = np.zeros((1, 0), dtype=np.int64)
+
+    for layer in layers:
+        data = np.asarray(layer['data'], dtype=np.uint32)
+        unique_gids, inverse = np.unique(data, return_inverse=True)
+
+        palettes.append(build_palette(unique_gids, tilesets, cache, tile_w, tile_h, scale))
+        opacities.append(float(layer.get('opacity', 1)))
+
+        # Добавляем слой к ключу стопки и сразу сжимаем ключ обратно в 0..N-1,
+        # чтобы он не переполнялся при большом числе слоёв
+        size = len(unique_gids)
+        unique_keys, key = np.unique(key * size + inverse.reshape(-1), return_inverse=True)
+        stacks = np.column_stack([stacks[unique_keys // size], unique_keys % size])
+
+    tiles = composite_stacks(stacks, palettes, opacities)
+    return key.reshape(height, width).astype(np.int32), tiles
+
+
+def render_region(grid: np.ndarray, tiles: np.ndarray, col0: int, row0: int,
+                  cols: int, rows: int) -> np.ndarray:
+    """
+    Собирает прямоугольник карты в пиксели блоками строк
+
+    Каждый блок - один fancy-index по массиву тайлов и один transpose,
+    без цикла по отдельным тайлам.
+    """
+    tile_h, tile_w = tiles.shape[1:3]
+    out = np.empty((rows * tile_h, cols * tile_w, 4), dtype=np.uint8)
+    block_rows = max(1, BLOCK_PIXELS // max(1, cols * tile_w * tile_h))
+
+    for start in range(0, rows, block_rows):
+        stop = min(rows, start + block_rows)
+        block = tiles[grid[row0 + start:row0 + stop, col0:col0 + cols]]
+        out[start * tile_h:stop * tile_h] = block.transpose(0, 2, 1, 3, 4).reshape(
+            (stop - start) * tile_h, cols * tile_w, 4)
+
+    return out
+
+
+def save_image(pixels: np.ndarray, path: Path, image_format: str):
+    """Сохранить RGBA массив в PNG или WebP (без потерь)"""
+    img = Image.fromarray(pixels, 'RGBA')
+    if image_format == 'webp':
+        img.save(path, 'WEBP', lossless=True, method=4)
+    else:
+        img.save(path, 'PNG', compress_level=6)
+
+
+def bake_map(map_path, layer_names: Optional[List[str]] = None, chunk_size: int = 0,
+             image_format: str = 'png', output_dir=None,
+             cache: Optional[TilesetCache] = None) -> Optional[Dict[str, Any]]:
+    """
+    Запекает статичные слои карты в изображение и пишет манифест рядом с картой
+
+    Args:
+        map_path: путь к JSON карте Tiled
+        layer_names: какие слои запекать (по умолчанию Floor, Walls, Decoration)
+        chunk_size: размер куска в пикселях (0 - одно цельное изображение)
+        image_format: 'png' или 'webp'
+        output_dir: куда сохранять (по умолчанию рядом с картой)
+        cache: общий кэш tilesets (для пакетной обработки)
+
+    Returns:
+        манифест (dict) или None при ошибке
+    """
+    map_path = Path(map_path)
+
+    if not map_path.exists():
+        print(f"❌ Файл не найден: {map_path}")
+        return None
+
+    if image_format not in ('png', 'webp'):
+        print(f"❌ Неизвестный формат: {image_format} (доступны png, webp)")
+        return None
+
+    layer_names = layer_names or DEFAULT_LAYERS
+    output_dir = Path(output_dir) if output_dir else map_path.parent
+    started = time.perf_counter()
+
+    with open(map_path, 'r', encoding='utf-8') as f:
+        map_data = json.load(f)
+
+    width = map_data['width']
+    height = map_data['height']
+    tile_w = map_data['tilewidth']
+    tile_h = map_data['tileheight']
+
+    print(f"🔥 Запекание карты: {map_path.name}")
+    print(f"   Размер: {width}×{height} тайлов ({width * tile_w}×{height * tile_h}px)")
+    print(f"   Слои: {', '.join(layer_names)}")
+
+    grid, tiles = compose_stacks(map_data, map_path.parent, layer_names, cache)
+    print(f"   🧩 Уникальных комбинаций тайлов: {len(tiles)}")
+
+    # Размер куска округляем вниз до целого числа тайлов
+    if chunk_size > 0:
+        chunk_cols = max(1, chunk_size // tile_w)
+        chunk_rows = max(1, chunk_size // tile_h)
+    else:
+        chunk_cols = width
+        chunk_rows = height
+
+    if image_format == 'webp' and max(chunk_cols * tile_w, chunk_rows * tile_h) > 16383:
+        print("❌ WebP ограничен 16383px по стороне - укажите --chunk")
+        return None
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"{map_path.stem}_baked"
+    single = chunk_cols >= width and chunk_rows >= height
+    chunks = []
+
+    for row0 in range(0, height, chunk_rows):
+        for col0 in range(0, width, chunk_cols):
+            if single:
+                file_name = f"{stem}.{image_format}"
+            else:
+                file_name = f"{stem}_{col0 // chunk_cols}_{row0 // chunk_rows}.{image_format}"
+
+            chunks.append({
+                "image": file_name,
+                "x": col0 * tile_w,
+                "y": row0 * tile_h,
+                "width": min(chunk_cols, width - col0) * tile_w,
+                "height": min(chunk_rows, height - row0) * tile_h
+            })
+
+    def write_chunk(chunk: Dict[str, Any]):
+        pixels = render_region(grid, tiles, chunk['x'] // tile_w, chunk['y'] // tile_h,
+                               chunk['width'] // tile_w, chunk['height'] // tile_h)
+        save_image(pixels, output_dir / chunk['image'], image_format)
+
+    # Кодирование PNG/WebP отпускает GIL, поэтому куски сохраняем параллельно
+    with ThreadPoolExecutor(max_workers=min(len(chunks), os.cpu_count() or 1)) as pool:
+        list(pool.map(write_chunk, chunks))
+
+    try:
+        relative_map = os.path.relpath(map_path, output_dir)
+    except ValueError:
+        relative_map = str(map_path)
+
+    manifest = {
+        "map": relative_map,
+        "layers": layer_names,
+        "tilewidth": tile_w,
+        "tileheight": tile_h,
+        "width": width * tile_w,
+        "height": height * tile_h,
+        "format": image_format,
+        "chunks": chunks
+    }
+
+    manifest_path = output_dir / f"{stem}.json"
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Запечено: {len(chunks)} изображений за {elapsed:.2f}с")
+    print(f"   📄 Манифест: {manifest_path}")
+
+    return manifest
+
+
+def main():
+    """Главная функция с обработкой аргументов командной строки"""
+
+    if len(sys.argv) < 2:
+        print("""
+🔥 Room Baker - запекание статичных слоёв карты
+
+Использование:
+  python3 bake_room.py <map.json>                       # Запечь Floor, Walls, Decoration
+  python3 bake_room.py <директория>                     # Запечь все карты в директории
+  python3 bake_room.py <map.json> --layers Floor,Walls  # Выбрать слои
+  python3 bake_room.py <map.json> --chunk 2048          # Разбить на куски 2048×2048
+
+Параметры:
+  --layers, -l         Слои через запятую (по умолчанию Floor,Walls,Decoration)
+  --chunk              Размер куска в пикселях (по умолчанию - одно изображение)
+  --format, -f         png или webp (по умолчанию png)
+  --output, -o         Директория для результата (по умолчанию рядом с картой)
+
+Примеры:
+  python3 bake_room.py public/assets/tilemaps/test_bedroom.json
+  python3 bake_room.py public/assets/tilemaps/ --format webp --chunk 2048
+""")
+        sys.exit(0)
+
+    input_path = Path(sys.argv[1])
+
+    kwargs = {
+        'layer_names': None,
+        'chunk_size': 0,
+        'image_format': 'png',
+        'output_dir': None
+    }
+
+    i = 2
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+
+        if arg in ['--layers', '-l'] and i + 1 < len(sys.argv):
+            kwargs['layer_names'] = [name.strip() for name in sys.argv[i + 1].split(',') if name.strip()]
+            i += 2
+        elif arg == '--chunk' and i + 1 < len(sys.argv):
+            kwargs['chunk_size'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg in ['--format', '-f'] and i + 1 < len(sys.argv):
+            kwargs['image_format'] = sys.argv[i + 1].lower()
+            i += 2
+        elif arg in ['--output', '-o'] and i + 1 < len(sys.argv):
+            kwargs['output_dir'] = sys.argv[i + 1]
+            i += 2
+        else:
+            i += 1
+
+    if input_path.is_dir():
+        map_files = [p for p in sorted(input_path.glob('*.json')) if not p.stem.endswith('_baked')]
+        cache = TilesetCache()
+        success_count = 0
+
+        for map_file in map_files:
+            if bake_map(map_file, cache=cache, **kwargs):
+                success_count += 1
+            print()
+
+        print(f"✅ Успешно запечено: {success_count}/{len(map_files)} карт")
+    elif input_path.is_file():
+        if not bake_map(input_path, **kwargs):
+            sys.exit(1)
+    else:
+        print(f"❌ Путь не найден: {input_path}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,38 +4,48 @@
 """
 
 import sys
+import os
+import io
+import re
 import json
+import shutil
+import tempfile
 from pathlib import Path
 from PIL import Image
 
-def convert_map_to_embedded(input_path, output_path=None):
-    """
-    Конвертирует карту с внешними tilesets во встроенный формат
+# Размер куска чтения в потоковом режиме
+STREAM_CHUNK_SIZE = 1024 * 1024
 
-    Args:
-        input_path: путь к исходному .json файлу карты
-        output_path: путь для сохранения (если None, перезаписывает исходный)
-    """
-    input_path = Path(input_path)
+# Символы, на которых потоковый сканер должен остановиться внутри значения;
+# всё остальное (числа, запятые, пробелы) пропускается одним regex-поиском
+_CONTAINER_SPECIAL = re.compile(rb'["\[\]{}]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb'[\s,\]}]')
+_NON_WHITESPACE = re.compile(rb'\S')
 
-    if not input_path.exists():
-        print(f"❌ Файл не найден: {input_path}")
-        return False
+# Маппинг известных tilesets
+TILESET_MAPPING = {
+    'Tileset_16x16_9': ('room_structure', '../tilesets/room_structure.png'),
+    'Interiors_free_16x16': ('furniture_props', '../furniture/furniture_props.png'),
+    'Tileset_16x16_1': ('floor_bedroom', '../tilesets/floor_bedroom.png'),
+}
 
-    # Читаем карту
-    with open(input_path, 'r', encoding='utf-8') as f:
-        map_data = json.load(f)
 
-    print(f"📖 Загружена карта: {input_path.name}")
-    print(f"   Размер: {map_data['width']}×{map_data['height']} тайлов")
-    print(f"   Слоёв: {len(map_data.get('layers', []))}")
-    print(f"   Tilesets: {len(map_data.get('tilesets', []))}")
+def embed_tilesets(tilesets, base_dir):
+    """
+    Заменяет внешние ссылки на tilesets встроенными описаниями
 
-    # Обрабатываем tilesets
+    Args:
+        tilesets: массив tilesets из карты
+        base_dir: директория карты (относительно неё ищутся изображения)
+
+    Returns:
+        новый массив tilesets (нераспознанные внешние ссылки пропускаются)
+    """
     new_tilesets = []
-    base_dir = input_path.parent
+    base_dir = Path(base_dir)
 
-    for idx, tileset in enumerate(map_data.get('tilesets', [])):
+    for idx, tileset in enumerate(tilesets):
         print(f"\n🔄 Обработка tileset {idx + 1}...")
 
         if 'source' in tileset:
@@ -49,18 +59,11 @@ def convert_map_to_embedded(input_path, output_path=None):
 
             firstgid = tileset['firstgid']
 
-            # Маппинг известных tilesets
-            tileset_mapping = {
-                'Tileset_16x16_9': ('room_structure', '../tilesets/room_structure.png'),
-                'Interiors_free_16x16': ('furniture_props', '../furniture/furniture_props.png'),
-                'Tileset_16x16_1': ('floor_bedroom', '../tilesets/floor_bedroom.png'),
-            }
-
             # Определяем имя из пути к .tsx
             tsx_name = Path(tileset['source']).stem
 
-            if tsx_name in tileset_mapping:
-                name, image_rel_path = tileset_mapping[tsx_name]
+            if tsx_name in TILESET_MAPPING:
+                name, image_rel_path = TILESET_MAPPING[tsx_name]
                 image_path = base_dir / image_rel_path
 
                 if image_path.exists():
@@ -110,6 +113,218 @@ def convert_map_to_embedded(input_path, output_path=None):
             print(f"   ✅ Уже встроенный tileset: {tileset.get('name', 'unnamed')}")
             new_tilesets.append(tileset)
 
+    return new_tilesets
+
+
+class JsonStreamCopier:
+    """
+    Потоковый сканер JSON: копирует значения байт-в-байт, не создавая Python объектов
+
+    Читает вход кусками по STREAM_CHUNK_SIZE; при подкачке уже пройденная часть
+    копируемого значения сбрасывается в sink, так что в памяти держится
+    только текущий кусок.
+    """
+
+    def __init__(self, source, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.buf = b''
+        self.pos = 0
+        self.sink = None
+        self.mark = 0
+
+    def _fill(self) -> bool:
+        """Подкачать следующий кусок; пройденное копируемое значение уходит в sink"""
+        if self.sink is not None:
+            self.sink.write(self.buf[self.mark:self.pos])
+            self.mark = 0
+
+        data = self.source.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return bool(data)
+
+    def _search(self, pattern):
+        """Найти pattern от текущей позиции, подкачивая данные; None при конце файла"""
+        while True:
+            match = pattern.search(self.buf, self.pos)
+            if match:
+                return match
+            self.pos = len(self.buf)
+            if not self._fill():
+                return None
+
+    def peek(self) -> bytes:
+        """Следующий значимый символ (пробелы пропускаются)"""
+        match = self._search(_NON_WHITESPACE)
+        if match is None:
+            raise ValueError("неожиданный конец JSON")
+        self.pos = match.start()
+        return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: bytes):
+        """Пропустить обязательный символ"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"ожидался {char!r}, найден {found!r}")
+        self.pos += 1
+
+    def _skip_string(self):
+        """Пропустить тело строки (открывающая кавычка уже пройдена)"""
+        while True:
+            match = self._search(_STRING_SPECIAL)
+            if match is None:
+                raise ValueError("незакрытая строка в JSON")
+            if match.group() == b'"':
+                self.pos = match.end()
+                return
+            # Экранирование: пропускаем следующий символ, он может быть в следующем куске
+            if match.end() < len(self.buf):
+                self.pos = match.end() + 1
+            else:
+                self.pos = match.start()
+                if not self._fill():
+                    raise ValueError("незакрытая строка в JSON")
+
+    def copy_value(self, sink):
+        """Скопировать одно JSON значение в sink как есть"""
+        first = self.peek()
+        self.sink = sink
+        self.mark = self.pos
+        self.pos += 1
+
+        if first == b'"':
+            self._skip_string()
+        elif first in (b'{', b'['):
+            depth = 1
+            while depth:
+                match = self._search(_CONTAINER_SPECIAL)
+                if match is None:
+                    raise ValueError("незакрытый массив или объект в JSON")
+                char = match.group()
+                self.pos = match.end()
+                if char == b'"':
+                    self._skip_string()
+                elif char in (b'{', b'['):
+                    depth += 1
+                else:
+                    depth -= 1
+        else:
+            match = self._search(_SCALAR_END)
+            self.pos = match.start() if match else len(self.buf)
+
+        sink.write(self.buf[self.mark:self.pos])
+        self.sink = None
+
+    def read_value(self):
+        """Прочитать одно (небольшое) значение в Python объект"""
+        raw = io.BytesIO()
+        self.copy_value(raw)
+        return json.loads(raw.getvalue())
+
+
+def stream_convert(input_path: Path, output_path: Path):
+    """
+    Потоковая конвертация: переписывается только секция tilesets,
+    все остальные значения верхнего уровня (включая data слоёв) копируются как есть
+
+    Returns:
+        (скалярные поля верхнего уровня, новые tilesets)
+    """
+    header = {}
+    new_tilesets = []
+
+    # Пишем во временный файл рядом - так можно перезаписывать исходную карту
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, suffix='.json.tmp')
+
+    try:
+        with open(input_path, 'rb') as src, os.fdopen(fd, 'wb') as out:
+            reader = JsonStreamCopier(src)
+            reader.expect(b'{')
+            out.write(b'{')
+            first = True
+
+            while reader.peek() != b'}':
+                if not first:
+                    reader.expect(b',')
+                key = reader.read_value()
+                reader.expect(b':')
+
+                out.write(b'\n  ' if first else b',\n  ')
+                out.write(json.dumps(key, ensure_ascii=False).encode('utf-8') + b': ')
+                first = False
+
+                if key == 'tilesets':
+                    new_tilesets = embed_tilesets(reader.read_value(), input_path.parent)
+                    text = json.dumps(new_tilesets, indent=2, ensure_ascii=False)
+                    out.write(text.replace('\n', '\n  ').encode('utf-8'))
+                elif reader.peek() in (b'{', b'['):
+                    reader.copy_value(out)
+                else:
+                    raw = io.BytesIO()
+                    reader.copy_value(raw)
+                    header[key] = json.loads(raw.getvalue())
+                    out.write(raw.getvalue())
+
+            reader.expect(b'}')
+            out.write(b'\n}\n')
+
+        # mkstemp создаёт файл с правами 0600 - возвращаем права исходной карты
+        shutil.copymode(input_path, tmp_name)
+        os.replace(tmp_name, output_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+    return header, new_tilesets
+
+
+def convert_map_to_embedded(input_path, output_path=None, stream=False):
+    """
+    Конвертирует карту с внешними tilesets во встроенный формат
+
+    Args:
+        input_path: путь к исходному .json файлу карты
+        output_path: путь для сохранения (если None, перезаписывает исходный)
+        stream: потоковый режим для огромных карт - память не растёт с размером
+                карты, data слоёв копируется без разбора (с исходным форматированием)
+    """
+    input_path = Path(input_path)
+
+    if not input_path.exists():
+        print(f"❌ Файл не найден: {input_path}")
+        return False
+
+    if stream:
+        output_path = input_path if output_path is None else Path(output_path)
+        print(f"📖 Потоковая конвертация: {input_path.name}")
+
+        try:
+            header, new_tilesets = stream_convert(input_path, output_path)
+        except ValueError as e:
+            print(f"❌ Ошибка разбора JSON: {e}")
+            return False
+
+        if 'width' in header and 'height' in header:
+            print(f"   Размер: {header['width']}×{header['height']} тайлов")
+
+        print(f"\n✅ Карта сохранена: {output_path}")
+        print(f"   Встроенных tilesets: {len(new_tilesets)}")
+        return True
+
+    # Читаем карту
+    with open(input_path, 'r', encoding='utf-8') as f:
+        map_data = json.load(f)
+
+    print(f"📖 Загружена карта: {input_path.name}")
+    print(f"   Размер: {map_data['width']}×{map_data['height']} тайлов")
+    print(f"   Слоёв: {len(map_data.get('layers', []))}")
+    print(f"   Tilesets: {len(map_data.get('tilesets', []))}")
+
+    # Обрабатываем tilesets
+    new_tilesets = embed_tilesets(map_data.get('tilesets', []), input_path.parent)
+
     # Обновляем tilesets в карте
     map_data['tilesets'] = new_tilesets
 
@@ -137,7 +352,10 @@ def main():
 🔄 Конвертер карт Tiled в формат со встроенными tilesets
 
 Использование:
-  python3 convert_to_embedded.py <input.json> [output.json]
+  python3 convert_to_embedded.py <input.json> [output.json] [--stream]
+
+Параметры:
+  --stream             Потоковый режим для огромных карт (память не растёт с размером)
 
 Примеры:
   # Конвертировать и перезаписать исходный файл
@@ -145,13 +363,19 @@ def main():
 
   # Конвертировать и сохранить в новый файл
   python3 convert_to_embedded.py "public/assets/tilemaps/комната 1.json" output.json
+
+  # Огромная карта
+  python3 convert_to_embedded.py big_map.json --stream
 """)
         sys.exit(0)
 
-    input_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    stream = '--stream' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--stream']
+
+    input_path = args[0]
+    output_path = args[1] if len(args) > 1 else None
 
-    convert_map_to_embedded(input_path, output_path)
+    convert_map_to_embedded(input_path, output_path, stream=stream)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Map Thumbnails - Быстрые превью и контактные листы для проверки карт
+Рисует маленькую миниатюру каждой карты в директории (параллельно, по процессам)
+и собирает их в страницы-листы с подписями
+"""
+
+import sys
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    print("❌ Ошибка: библиотека Pillow не установлена")
+    print("Установите: pip3 install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Ошибка: библиотека numpy не установлена")
+    print("Установите: pip3 install numpy")
+    sys.exit(1)
+
+from bake_room import TilesetCache, compose_stacks, render_region, resolve_tilesets
+
+# Все слои карты, которые имеет смысл показывать на превью
+PREVIEW_LAYERS = ["Floor", "Walls", "Furniture", "Decoration"]
+
+LABEL_HEIGHT = 14
+
+# Кэш tilesets живёт по одному на процесс-воркер
+_worker_cache: Optional[TilesetCache] = None
+
+
+def _init_worker():
+    """Создаёт кэш tilesets при старте процесса-воркера"""
+    global _worker_cache
+    _worker_cache = TilesetCache()
+
+
+def pick_scale(tile_w: int, tile_h: int, map_w: int, map_h: int, size: int,
+               tileset_sizes: Optional[List[Tuple[int, int]]] = None) -> int:
+    """
+    Выбирает, во сколько раз уменьшать тайлы перед сборкой превью
+
+    Берётся наибольший общий делитель размеров тайла карты и тайлов всех
+    tilesets (downsample_tiles уменьшает их блоками scale×scale), при котором
+    превью всё ещё не меньше size - дальше его дожимает быстрый resize.
+    """
+    sides = [tile_w, tile_h] + [side for sizes in (tileset_sizes or []) for side in sizes]
+    best = 1
+    for scale in range(1, min(tile_w, tile_h) + 1):
+        if any(side % scale for side in sides):
+            continue
+        if max(map_w * tile_w, map_h * tile_h) // scale >= size:
+            best = scale
+    return best
+
+
+def render_thumbnail(map_path, size: int = 256,
+                     layer_names: Optional[List[str]] = None) -> Optional[np.ndarray]:
+    """
+    Рисует превью карты, не превышающее size×size пикселей
+
+    Returns:
+        RGBA массив превью или None, если карту не удалось прочитать
+    """
+    global _worker_cache
+    if _worker_cache is None:
+        _worker_cache = TilesetCache()
+
+    map_path = Path(map_path)
+
+    try:
+        with open(map_path, 'r', encoding='utf-8') as f:
+            map_data = json.load(f)
+
+        width = map_data['width']
+        height = map_data['height']
+        tile_w = map_data['tilewidth']
+        tile_h = map_data['tileheight']
+    except (OSError, ValueError, KeyError):
+        return None
+
+    tileset_sizes = [(ts['tilewidth'], ts['tileheight'])
+                     for ts in resolve_tilesets(map_data, map_path.parent)]
+    scale = pick_scale(tile_w, tile_h, width, height, size, tileset_sizes)
+    grid, tiles = compose_stacks(map_data, map_path.parent, layer_names or PREVIEW_LAYERS,
+                                 _worker_cache, scale)
+    pixels = render_region(grid, tiles, 0, 0, width, height)
+
+    img = Image.fromarray(pixels, 'RGBA')
+    img.thumbnail((size, size), Image.Resampling.BOX)
+    return np.asarray(img)
+
+
+def _render_job(job: Tuple[str, int, Optional[List[str]], Optional[str]]):
+    """Задача для воркера: превью одной карты (+ сохранение в PNG)"""
+    map_path, size, layer_names, thumbs_dir = job
+
+    try:
+        thumb = render_thumbnail(map_path, size, layer_names)
+    except Exception as e:
+        print(f"   ⚠️  {Path(map_path).name}: {e}")
+        thumb = None
+
+    if thumb is not None and thumbs_dir:
+        Image.fromarray(thumb, 'RGBA').save(Path(thumbs_dir) / f"{Path(map_path).stem}.png")
+
+    return map_path, thumb
+
+
+def build_contact_sheets(items: List[Tuple[str, Optional[np.ndarray]]], output_dir: Path,
+                         size: int = 256, columns: int = 8, rows: int = 6) -> List[Path]:
+    """
+    Собирает превью в страницы-листы с подписями
+
+    Args:
+        items: пары (имя карты, RGBA превью или None для битой карты)
+        output_dir: куда сохранять contact_sheet_XXX.png
+        size: размер ячейки под превью
+        columns, rows: сетка одной страницы
+
+    Returns:
+        список путей к сохранённым страницам
+    """
+    font = ImageFont.load_default()
+    per_page = columns * rows
+    cell_w = size
+    cell_h = size + LABEL_HEIGHT
+    pages = []
+
+    for page_index in range(math.ceil(len(items) / per_page)):
+        page_items = items[page_index * per_page:(page_index + 1) * per_page]
+        page_rows = math.ceil(len(page_items) / columns)
+        sheet = Image.new('RGB', (columns * cell_w, page_rows * cell_h), (32, 32, 32))
+        draw = ImageDraw.Draw(sheet)
+
+        for index, (name, thumb) in enumerate(page_items):
+            x = (index % columns) * cell_w
+            y = (index // columns) * cell_h
+
+            if thumb is None:
+                draw.rectangle([x + 1, y + 1, x + cell_w - 2, y + size - 2], outline=(200, 60, 60))
+                draw.text((x + 4, y + 4), "ERROR", fill=(200, 60, 60), font=font)
+            else:
+                img = Image.fromarray(thumb, 'RGBA')
+                offset = (x + (cell_w - img.width) // 2, y + (size - img.height) // 2)
+                sheet.paste(img, offset, img)
+
+            label = Path(name).stem
+            if len(label) > size // 6:
+                label = label[:size // 6 - 1] + '…'
+            draw.text((x + 2, y + size + 1), label, fill=(230, 230, 230), font=font)
+
+        page_path = output_dir / f"contact_sheet_{page_index + 1:03d}.png"
+        sheet.save(page_path)
+        pages.append(page_path)
+
+    return pages
+
+
+def process_directory(directory, output_dir=None, size: int = 256, columns: int = 8,
+                      rows: int = 6, workers: Optional[int] = None,
+                      layer_names: Optional[List[str]] = None, save_thumbs: bool = True):
+    """
+    Рисует превью для всех карт в директории и собирает контактные листы
+
+    Args:
+        directory: директория с JSON картами
+        output_dir: куда сохранять (по умолчанию <directory>/_thumbnails)
+        size: максимальный размер превью в пикселях
+        columns, rows: сетка одной страницы листа
+        workers: число процессов (по умолчанию - по числу ядер)
+        layer_names: какие слои рисовать
+        save_thumbs: сохранять ли отдельные PNG превью
+    """
+    directory = Path(directory)
+
+    if not directory.exists() or not directory.is_dir():
+        print(f"❌ Директория не найдена: {directory}")
+        return
+
+    map_files = [p for p in sorted(directory.glob('*.json')) if not p.stem.endswith('_baked')]
+
+    if not map_files:
+        print(f"⚠️  JSON карты не найдены в {directory}")
+        return
+
+    output_dir = Path(output_dir) if output_dir else directory / "_thumbnails"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    thumbs_dir = output_dir / "thumbs" if save_thumbs else None
+    if thumbs_dir:
+        thumbs_dir.mkdir(exist_ok=True)
+
+    print(f"\n🔍 Найдено {len(map_files)} карт в {directory}")
+    started = time.perf_counter()
+
+    jobs = [(str(p), size, layer_names, str(thumbs_dir) if thumbs_dir else None) for p in map_files]
+    # Крупные пачки задач - меньше накладных расходов на пересылку между процессами
+    chunksize = max(1, len(jobs) // ((workers or 4) * 8))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        items = list(pool.map(_render_job, jobs, chunksize=chunksize))
+
+    failed = sum(1 for _, thumb in items if thumb is None)
+    pages = build_contact_sheets(items, output_dir, size, columns, rows)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Превью: {len(items) - failed}/{len(items)}, листов: {len(pages)} за {elapsed:.2f}с")
+    print(f"   📁 Результат: {output_dir}")
+
+
+def main():
+    """Главная функция с обработкой аргументов командной строки"""
+
+    if len(sys.argv) < 2:
+        print("""
+🖼️  Map Thumbnails - превью и контактные листы карт
+
+Использование:
+  python3 map_thumbnails.py <директория>                # Превью всех карт + листы
+  python3 map_thumbnails.py <директория> --size 128     # Размер превью
+
+Параметры:
+  --output, -o         Директория результата (по умолчанию <директория>/_thumbnails)
+  --size               Максимальный размер превью (по умолчанию 256)
+  --columns            Колонок на листе (по умолчанию 8)
+  --rows               Строк на листе (по умолчанию 6)
+  --workers, -j        Число процессов (по умолчанию - по числу ядер)
+  --layers, -l         Слои через запятую (по умолчанию Floor,Walls,Furniture,Decoration)
+  --no-thumbs          Не сохранять отдельные PNG превью
+
+Примеры:
+  python3 map_thumbnails.py public/assets/tilemaps/
+  python3 map_thumbnails.py generated_rooms/ --size 128 --columns 12 -j 8
+""")
+        sys.exit(0)
+
+    input_path = Path(sys.argv[1])
+
+    kwargs = {
+        'output_dir': None,
+        'size': 256,
+        'columns': 8,
+        'rows': 6,
+        'workers': None,
+        'layer_names': None,
+        'save_thumbs': True
+    }
+
+    i = 2
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+
+        if arg in ['--output', '-o'] and i + 1 < len(sys.argv):
+            kwargs['output_dir'] = sys.argv[i + 1]
+            i += 2
+        elif arg == '--size' and i + 1 < len(sys.argv):
+            kwargs['size'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--columns' and i + 1 < len(sys.argv):
+            kwargs['columns'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--rows' and i + 1 < len(sys.argv):
+            kwargs['rows'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg in ['--workers', '-j'] and i + 1 < len(sys.argv):
+            kwargs['workers'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg in ['--layers', '-l'] and i + 1 < len(sys.argv):
+            kwargs['layer_names'] = [name.strip() for name in sys.argv[i + 1].split(',') if name.strip()]
+            i += 2
+        elif arg == '--no-thumbs':
+            kwargs['save_thumbs'] = False
+            i += 1
+        else:
+            i += 1
+
+    if input_path.is_dir():
+        process_directory(input_path, **kwargs)
+    else:
+        print(f"❌ Директория не найдена: {input_path}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
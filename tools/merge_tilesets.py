@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Tileset Merger - Объединение tilesets карт в одну текстуру
+Копирует в общий лист только реально используемые тайлы (с экструзией краёв),
+встраивает его в карты и переписывает GID во всех слоях одной таблицей подстановки
+"""
+
+import sys
+import os
+import json
+import math
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Ошибка: библиотека Pillow не установлена")
+    print("Установите: pip3 install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Ошибка: библиотека numpy не установлена")
+    print("Установите: pip3 install numpy")
+    sys.exit(1)
+
+from bake_room import TilesetCache, resolve_tilesets
+from tile_utils import GID_MASK
+
+
+def tileset_key(tileset: Dict[str, Any]) -> Tuple:
+    """Ключ tileset, одинаковый для всех карт, ссылающихся на одно изображение"""
+    return (
+        str(Path(tileset['image']).resolve()),
+        tileset['tilewidth'], tileset['tileheight'],
+        tileset['spacing'], tileset['margin'],
+    )
+
+
+def iter_layers(layers: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Все слои карты, включая вложенные в группы (type: "group")"""
+    for layer in layers:
+        yield layer
+        if layer.get('type') == 'group':
+            yield from iter_layers(layer.get('layers', []))
+
+
+def unsupported_layer(map_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Ищет тайловый слой, GID которого нельзя переписать
+
+    Returns:
+        описание первого такого слоя или None, если переписать можно все
+    """
+    for layer in iter_layers(map_data.get('layers', [])):
+        if layer.get('type') != 'tilelayer':
+            continue
+        name = layer.get('name', 'unnamed')
+        if 'chunks' in layer:
+            return f"слой {name}: бесконечная карта (chunks) не поддерживается"
+        if layer.get('encoding') == 'base64' or layer.get('compression') or not isinstance(layer.get('data'), list):
+            return (f"слой {name}: данные закодированы (encoding={layer.get('encoding')}, "
+                    f"compression={layer.get('compression') or 'нет'}) - сохраните карту в Tiled "
+                    f"с форматом слоёв CSV")
+    return None
+
+
+def collect_gids(map_data: Dict[str, Any]) -> np.ndarray:
+    """Все GID карты без флагов отражения: тайловые слои и тайл-объекты (и в группах)"""
+    parts = [np.zeros(1, dtype=np.uint32)]
+
+    for layer in iter_layers(map_data.get('layers', [])):
+        if layer.get('type') == 'tilelayer':
+            parts.append(np.unique(np.asarray(layer['data'], dtype=np.uint32) & GID_MASK))
+        elif layer.get('type') == 'objectgroup':
+            gids = [obj['gid'] for obj in layer.get('objects', []) if 'gid' in obj]
+            if gids:
+                parts.append(np.asarray(gids, dtype=np.uint32) & GID_MASK)
+
+    return np.unique(np.concatenate(parts))
+
+
+def remap_layers(map_data: Dict[str, Any], lut: np.ndarray):
+    """
+    Переписывает GID во всех слоях через таблицу lut[старый GID] = новый GID
+
+    Флаги отражения в старших битах сохраняются. Слои внутри групп
+    переписываются так же.
+    """
+    for layer in iter_layers(map_data.get('layers', [])):
+        if layer.get('type') == 'tilelayer':
+            data = np.asarray(layer['data'], dtype=np.uint32)
+            remapped = lut[data & GID_MASK] | (data & ~np.uint32(GID_MASK))
+            layer['data'] = remapped.tolist()
+        elif layer.get('type') == 'objectgroup':
+            for obj in layer.get('objects', []):
+                if 'gid' in obj:
+                    raw = obj['gid']
+                    obj['gid'] = int(lut[raw & GID_MASK]) | (raw & ~GID_MASK)
+
+
+def merge_tilesets(map_paths: List[Path], output_dir=None, name: str = "merged_tiles",
+                   extrude: int = 1) -> bool:
+    """
+    Объединяет tilesets набора карт в один общий лист
+
+    Args:
+        map_paths: JSON карты Tiled
+        output_dir: куда писать карты и лист (по умолчанию карты перезаписываются,
+                    лист кладётся рядом с первой картой)
+        name: имя общего tileset и файла листа
+        extrude: на сколько пикселей дублировать края тайлов (против швов при масштабировании)
+
+    Returns:
+        True при успехе
+    """
+    cache = TilesetCache()
+    maps = []
+
+    # Собираем используемые тайлы всех карт: (ключ tileset, локальный id)
+    used: Dict[Tuple, Dict[str, Any]] = {}
+    used_ids: Dict[Tuple, set] = {}
+    tile_size = None
+
+    for map_path in map_paths:
+        with open(map_path, 'r', encoding='utf-8') as f:
+            map_data = json.load(f)
+
+        # Проверяем до записи чего-либо: карта с непереписанным слоем была бы испорчена
+        problem = unsupported_layer(map_data)
+        if problem:
+            print(f"❌ {map_path.name}: {problem}")
+            return False
+
+        map_tile = (map_data['tilewidth'], map_data['tileheight'])
+        tilesets = resolve_tilesets(map_data, map_path.parent)
+        firstgids = np.array([ts['firstgid'] for ts in tilesets], dtype=np.int64)
+        gids = collect_gids(map_data)
+        gids = gids[gids > 0]
+
+        if tile_size is None:
+            tile_size = map_tile
+        elif tile_size != map_tile:
+            print(f"❌ {map_path.name}: размер тайла {map_tile} отличается от {tile_size}")
+            return False
+
+        ts_indices = np.searchsorted(firstgids, gids, side='right') - 1
+        for ts_index in np.unique(ts_indices[ts_indices >= 0]):
+            tileset = tilesets[ts_index]
+            if (tileset['tilewidth'], tileset['tileheight']) != tile_size:
+                print(f"❌ {map_path.name}: tileset {tileset['name']} с тайлом "
+                      f"{tileset['tilewidth']}×{tileset['tileheight']} нельзя объединить "
+                      f"в лист {tile_size[0]}×{tile_size[1]}")
+                return False
+
+            key = tileset_key(tileset)
+            used.setdefault(key, tileset)
+            local = gids[ts_indices == ts_index].astype(np.int64) - tileset['firstgid']
+            used_ids.setdefault(key, set()).update(int(i) for i in local)
+
+        maps.append((map_path, map_data, tilesets, int(gids.max(initial=0))))
+
+    if not used:
+        print("⚠️  В картах нет ни одного тайла")
+        return False
+
+    # Раскладка общего листа: стабильный порядок (tileset, локальный id)
+    order = []
+    picked_parts = []
+    for key in sorted(used):
+        tiles = cache.get(used[key])
+        valid = sorted(i for i in used_ids[key] if i < len(tiles))
+        order.extend((key, i) for i in valid)
+        picked_parts.append(tiles[valid])
+
+    new_index = {entry: index for index, entry in enumerate(order)}
+    tile_w, tile_h = tile_size
+
+    # Копируем используемые тайлы и экструдируем края одним np.pad на весь набор
+    picked = np.concatenate(picked_parts)
+    padded = np.pad(picked, ((0, 0), (extrude, extrude), (extrude, extrude), (0, 0)), mode='edge')
+
+    columns = max(1, math.ceil(math.sqrt(len(order))))
+    rows = math.ceil(len(order) / columns)
+    cell_w = tile_w + 2 * extrude
+    cell_h = tile_h + 2 * extrude
+
+    cells = np.zeros((rows * columns, cell_h, cell_w, 4), dtype=np.uint8)
+    cells[:len(order)] = padded
+    sheet = cells.reshape(rows, columns, cell_h, cell_w, 4).transpose(0, 2, 1, 3, 4).reshape(
+        rows * cell_h, columns * cell_w, 4)
+
+    output_dir = Path(output_dir) if output_dir else None
+    sheet_dir = output_dir or map_paths[0].parent
+    sheet_dir.mkdir(parents=True, exist_ok=True)
+    sheet_path = sheet_dir / f"{name}.png"
+    Image.fromarray(sheet, 'RGBA').save(sheet_path, optimize=True)
+
+    source_count = 0
+    for map_path, map_data, tilesets, max_gid in maps:
+        # Таблица подстановки старый GID -> новый GID (0 и неизвестные GID -> 0)
+        lut = np.zeros(max_gid + 1, dtype=np.uint32)
+
+        for tileset in tilesets:
+            key = tileset_key(tileset)
+            if key not in used:
+                continue
+            for local_id in used_ids[key]:
+                gid = tileset['firstgid'] + local_id
+                if gid <= max_gid and (key, local_id) in new_index:
+                    lut[gid] = new_index[(key, local_id)] + 1
+
+        remap_layers(map_data, lut)
+        source_count = max(source_count, len(tilesets))
+
+        out_path = output_dir / map_path.name if output_dir else map_path
+        try:
+            relative_sheet = os.path.relpath(sheet_path, out_path.parent)
+        except ValueError:
+            relative_sheet = str(sheet_path)
+
+        map_data['tilesets'] = [{
+            "firstgid": 1,
+            "name": name,
+            "tilewidth": tile_w,
+            "tileheight": tile_h,
+            "tilecount": len(order),
+            "columns": columns,
+            "image": relative_sheet.replace(os.sep, '/'),
+            "imagewidth": sheet.shape[1],
+            "imageheight": sheet.shape[0],
+            "margin": extrude,
+            "spacing": 2 * extrude
+        }]
+
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(map_data, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ Общий лист: {sheet_path}")
+    print(f"   📐 Размер: {sheet.shape[1]}×{sheet.shape[0]}px, тайлов: {len(order)} ({columns} колонок)")
+    print(f"   🎨 Исходных tilesets: {len(used)} → 1 (в карте было до {source_count})")
+    print(f"   🗺️  Переписано карт: {len(maps)}")
+
+    return True
+
+
+def main():
+    """Главная функция с обработкой аргументов командной строки"""
+
+    if len(sys.argv) < 2:
+        print("""
+🧩 Tileset Merger - объединение tilesets в одну текстуру
+
+Использование:
+  python3 merge_tilesets.py <map.json>                # Объединить tilesets одной карты
+  python3 merge_tilesets.py <директория>              # Общий лист для всех карт директории
+
+Параметры:
+  --output, -o         Директория для карт и листа (по умолчанию карты перезаписываются)
+  --name, -n           Имя общего tileset (по умолчанию merged_tiles)
+  --extrude            Экструзия краёв тайла в пикселях (по умолчанию 1)
+
+Примеры:
+  python3 merge_tilesets.py public/assets/tilemaps/test_bedroom.json
+  python3 merge_tilesets.py public/assets/tilemaps/ -o public/assets/tilemaps/merged
+""")
+        sys.exit(0)
+
+    input_path = Path(sys.argv[1])
+
+    kwargs = {
+        'output_dir': None,
+        'name': 'merged_tiles',
+        'extrude': 1
+    }
+
+    i = 2
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+
+        if arg in ['--output', '-o'] and i + 1 < len(sys.argv):
+            kwargs['output_dir'] = sys.argv[i + 1]
+            i += 2
+        elif arg in ['--name', '-n'] and i + 1 < len(sys.argv):
+            kwargs['name'] = sys.argv[i + 1]
+            i += 2
+        elif arg == '--extrude' and i + 1 < len(sys.argv):
+            kwargs['extrude'] = int(sys.argv[i + 1])
+            i += 2
+        else:
+            i += 1
+
+    if input_path.is_dir():
+        map_paths = [p for p in sorted(input_path.glob('*.json')) if not p.stem.endswith('_baked')]
+    elif input_path.is_file():
+        map_paths = [input_path]
+    else:
+        print(f"❌ Путь не найден: {input_path}")
+        sys.exit(1)
+
+    if not map_paths:
+        print(f"⚠️  JSON карты не найдены в {input_path}")
+        sys.exit(1)
+
+    if not merge_tilesets(map_paths, **kwargs):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
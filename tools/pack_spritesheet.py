@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Spritesheet Packer - Обрезка и упаковка спрайт-листов персонажей в атлас
+Режет спрайт-лист по размеру кадра, обрезает прозрачные поля, убирает
+повторяющиеся кадры и сохраняет атлас Phaser (JSON Hash) со смещениями кадров
+"""
+
+import sys
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Ошибка: библиотека Pillow не установлена")
+    print("Установите: pip3 install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Ошибка: библиотека numpy не установлена")
+    print("Установите: pip3 install numpy")
+    sys.exit(1)
+
+from tile_utils import slice_tiles, trim_bounds
+
+
+def shelf_pack(sizes: List[Tuple[int, int]], padding: int = 1) -> Tuple[List[Tuple[int, int]], int, int]:
+    """
+    Раскладывает прямоугольники по полкам (строкам), высокие первыми
+
+    Перебирает несколько ширин атласа и оставляет раскладку с наименьшей площадью.
+
+    Returns:
+        (позиции в исходном порядке, ширина атласа, высота атласа)
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    max_width = max(w for w, _ in sizes)
+    total_width = sum(w + padding for w, _ in sizes)
+    step = max(1, (total_width - max_width) // 64)
+
+    best = None
+    for limit in range(max_width, total_width + step, step):
+        positions: List[Tuple[int, int]] = [(0, 0)] * len(sizes)
+        x = y = shelf_height = used_width = 0
+
+        for index in order:
+            w, h = sizes[index]
+            if x + w > limit:
+                y += shelf_height + padding
+                x = shelf_height = 0
+
+            positions[index] = (x, y)
+            used_width = max(used_width, x + w)
+            x += w + padding
+            shelf_height = max(shelf_height, h)
+
+        area = used_width * (y + shelf_height)
+        if best is None or area < best[0]:
+            best = (area, positions, used_width, y + shelf_height)
+
+    return best[1], best[2], best[3]
+
+
+def pack_spritesheet(sheet_path, frame_width: int, frame_height: int, output_path=None,
+                     spacing: int = 0, margin: int = 0, padding: int = 1,
+                     frame_count: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Упаковывает спрайт-лист в обрезанный атлас
+
+    Кадры называются "0", "1", ... как в исходном спрайт-листе, поэтому
+    generateFrameNumbers() в анимациях продолжает работать с атласом.
+
+    Args:
+        sheet_path: путь к спрайт-листу (PNG/WebP)
+        frame_width, frame_height: размер кадра
+        output_path: путь к изображению атласа (по умолчанию <имя>_atlas.<ext>)
+        spacing, margin: отступы в исходном листе
+        padding: прозрачный зазор между кадрами в атласе
+        frame_count: сколько кадров брать (по умолчанию все)
+
+    Returns:
+        данные атласа (dict) или None при ошибке
+    """
+    sheet_path = Path(sheet_path)
+
+    if not sheet_path.exists():
+        print(f"❌ Файл не найден: {sheet_path}")
+        return None
+
+    with Image.open(sheet_path) as img:
+        sheet_size = img.size
+        pixels = np.asarray(img.convert('RGBA'))
+
+    frames = slice_tiles(pixels, frame_width, frame_height, spacing, margin)
+    if frame_count is not None:
+        frames = frames[:frame_count]
+
+    if len(frames) == 0:
+        print(f"❌ Кадр {frame_width}×{frame_height} больше изображения {sheet_size[0]}×{sheet_size[1]}")
+        return None
+
+    bounds = trim_bounds(frames)
+
+    # Убираем повторы: одинаковые по содержимому обрезанные кадры делят одно место в атласе
+    unique_index: Dict[Tuple[int, int, bytes], int] = {}
+    frame_to_unique: List[int] = []
+    unique_frames: List[np.ndarray] = []
+
+    for frame, (x, y, w, h) in zip(frames, bounds):
+        trimmed = frame[y:y + h, x:x + w]
+        key = (int(w), int(h), trimmed.tobytes())
+        if key not in unique_index:
+            unique_index[key] = len(unique_frames)
+            unique_frames.append(trimmed)
+        frame_to_unique.append(unique_index[key])
+
+    sizes = [(f.shape[1], f.shape[0]) for f in unique_frames]
+    positions, atlas_width, atlas_height = shelf_pack(sizes, padding)
+
+    atlas = np.zeros((atlas_height, atlas_width, 4), dtype=np.uint8)
+    for frame, (x, y) in zip(unique_frames, positions):
+        atlas[y:y + frame.shape[0], x:x + frame.shape[1]] = frame
+
+    if output_path is None:
+        output_path = sheet_path.with_name(f"{sheet_path.stem}_atlas{sheet_path.suffix}")
+    else:
+        output_path = Path(output_path)
+
+    frames_json = {}
+    for index, (x, y, w, h) in enumerate(bounds.tolist()):
+        atlas_x, atlas_y = positions[frame_to_unique[index]]
+        frames_json[str(index)] = {
+            "frame": {"x": atlas_x, "y": atlas_y, "w": w, "h": h},
+            "rotated": False,
+            "trimmed": (w, h) != (frame_width, frame_height),
+            "spriteSourceSize": {"x": x, "y": y, "w": w, "h": h},
+            "sourceSize": {"w": frame_width, "h": frame_height}
+        }
+
+    atlas_data = {
+        "frames": frames_json,
+        "meta": {
+            "image": output_path.name,
+            "format": "RGBA8888",
+            "size": {"w": atlas_width, "h": atlas_height},
+            "scale": "1"
+        }
+    }
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    atlas_img = Image.fromarray(atlas, 'RGBA')
+    if output_path.suffix.lower() == '.webp':
+        atlas_img.save(output_path, 'WEBP', lossless=True)
+    else:
+        atlas_img.save(output_path, optimize=True)
+
+    json_path = output_path.with_suffix('.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(atlas_data, f, indent=2, ensure_ascii=False)
+
+    sheet_bytes = sheet_size[0] * sheet_size[1] * 4
+    atlas_bytes = atlas_width * atlas_height * 4
+    saved = sheet_bytes - atlas_bytes
+
+    print(f"✅ Атлас: {output_path}")
+    print(f"   🎞️  Кадров: {len(frames)} (уникальных: {len(unique_frames)})")
+    print(f"   📐 Лист {sheet_size[0]}×{sheet_size[1]}px → атлас {atlas_width}×{atlas_height}px")
+    print(f"   💾 Текстура: {sheet_bytes:,} → {atlas_bytes:,} байт "
+          f"(сэкономлено {saved:,}, {saved * 100 / sheet_bytes:.1f}%)")
+    print(f"   📄 Данные кадров: {json_path}")
+    print(f"   💡 Загрузка: this.load.atlas(key, '{output_path.name}', '{json_path.name}')")
+
+    return atlas_data
+
+
+def main():
+    """Главная функция с обработкой аргументов командной строки"""
+
+    if len(sys.argv) < 2:
+        print("""
+🎞️  Spritesheet Packer - обрезка и упаковка спрайт-листов в атлас
+
+Использование:
+  python3 pack_spritesheet.py <лист.webp> --frame 16x32             # Упаковать лист
+  python3 pack_spritesheet.py <лист.webp> --frame 32 -o atlas.webp  # Квадратные кадры
+
+Параметры:
+  --frame              Размер кадра: WxH или одно число (по умолчанию 16x32)
+  --output, -o         Путь к изображению атласа (JSON сохраняется рядом)
+  --spacing            Отступ между кадрами в исходном листе
+  --margin             Отступ от края исходного листа
+  --padding            Зазор между кадрами в атласе (по умолчанию 1)
+  --count              Сколько кадров брать (по умолчанию все)
+
+Примеры:
+  python3 pack_spritesheet.py "public/assets/characters/Karina run.webp" --frame 16x32
+  python3 pack_spritesheet.py public/assets/characters/Dasha_sit.webp --frame 32x32
+""")
+        sys.exit(0)
+
+    input_path = Path(sys.argv[1])
+
+    kwargs = {
+        'frame_width': 16,
+        'frame_height': 32,
+        'output_path': None,
+        'spacing': 0,
+        'margin': 0,
+        'padding': 1,
+        'frame_count': None
+    }
+
+    i = 2
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+
+        if arg == '--frame' and i + 1 < len(sys.argv):
+            parts = sys.argv[i + 1].lower().split('x')
+            kwargs['frame_width'] = int(parts[0])
+            kwargs['frame_height'] = int(parts[1]) if len(parts) > 1 else int(parts[0])
+            i += 2
+        elif arg in ['--output', '-o'] and i + 1 < len(sys.argv):
+            kwargs['output_path'] = sys.argv[i + 1]
+            i += 2
+        elif arg == '--spacing' and i + 1 < len(sys.argv):
+            kwargs['spacing'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--margin' and i + 1 < len(sys.argv):
+            kwargs['margin'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--padding' and i + 1 < len(sys.argv):
+            kwargs['padding'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--count' and i + 1 < len(sys.argv):
+            kwargs['frame_count'] = int(sys.argv[i + 1])
+            i += 2
+        else:
+            i += 1
+
+    if not pack_spritesheet(input_path, **kwargs):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -255,12 +255,12 @@ class RoomGenerator:
         print(f"   🎨 Tilesets: {len(self.tilesets)}")
 
 
-def generate_bedroom(output_path: Path, width: int = 20, height: int = 15):
+def generate_bedroom(output_path: Optional[Path], width: int = 20, height: int = 15) -> RoomGenerator:
     """
     Генерирует спальню
 
     Args:
-        output_path: путь для сохранения .json
+        output_path: путь для сохранения .json (None - только вернуть комнату)
         width: ширина комнаты в тайлах
         height: высота комнаты в тайлах
     """
@@ -330,10 +330,12 @@ def generate_bedroom(output_path: Path, width: int = 20, height: int = 15):
     room.create_layer("Decoration")
 
     # Сохраняем
-    room.save(output_path)
+    if output_path is not None:
+        room.save(output_path)
+    return room
 
 
-def generate_kitchen(output_path: Path, width: int = 18, height: int = 12):
+def generate_kitchen(output_path: Optional[Path], width: int = 18, height: int = 12) -> RoomGenerator:
     """Генерирует кухню"""
     print(f"\n🍳 Генерация кухни {width}x{height}...")
 
@@ -395,10 +397,12 @@ def generate_kitchen(output_path: Path, width: int = 18, height: int = 12):
     room.add_furniture_grid("Furniture", furniture_tileset, kitchen_furniture, spacing=3)
 
     room.create_layer("Decoration")
-    room.save(output_path)
+    if output_path is not None:
+        room.save(output_path)
+    return room
 
 
-def generate_bathroom(output_path: Path, width: int = 12, height: int = 10):
+def generate_bathroom(output_path: Optional[Path], width: int = 12, height: int = 10) -> RoomGenerator:
     """Генерирует ванную комнату"""
     print(f"\n🚿 Генерация ванной {width}x{height}...")
 
@@ -458,7 +462,9 @@ def generate_bathroom(output_path: Path, width: int = 12, height: int = 10):
     room.add_furniture_grid("Furniture", furniture_tileset, bathroom_furniture, spacing=3)
 
     room.create_layer("Decoration")
-    room.save(output_path)
+    if output_path is not None:
+        room.save(output_path)
+    return room
 
 
 def main():
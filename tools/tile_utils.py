@@ -0,0 +1,66 @@
+"""
+Общие помощники для тайловых листов: флаги GID Tiled и векторные операции
+над массивами тайлов (нарезка листа, alpha bounding box)
+
+Модуль не проверяет наличие numpy сам - его импортируют инструменты,
+которые уже проверили зависимости и сообщили об ошибке.
+"""
+
+import numpy as np
+
+
+# Флаги отражения тайла, которые Tiled хранит в старших битах GID
+FLIPPED_HORIZONTALLY = 0x80000000
+FLIPPED_VERTICALLY = 0x40000000
+FLIPPED_DIAGONALLY = 0x20000000
+GID_MASK = 0x1FFFFFFF
+
+
+def slice_tiles(pixels: np.ndarray, tile_w: int, tile_h: int,
+                spacing: int = 0, margin: int = 0) -> np.ndarray:
+    """
+    Режет RGBA изображение (H, W, 4) на тайлы одним reshape
+
+    Returns:
+        массив (rows * columns, tile_h, tile_w, 4) uint8 в порядке строк
+    """
+    img_h, img_w = pixels.shape[:2]
+    columns = (img_w - 2 * margin + spacing) // (tile_w + spacing)
+    rows = (img_h - 2 * margin + spacing) // (tile_h + spacing)
+
+    # Добавляем "виртуальный" spacing справа и снизу, чтобы сетка
+    # ровно делилась на шаг (tile + spacing) и резалась одним reshape
+    step_w = tile_w + spacing
+    step_h = tile_h + spacing
+    grid = np.zeros((rows * step_h, columns * step_w, 4), dtype=np.uint8)
+    region = pixels[margin:margin + rows * step_h, margin:margin + columns * step_w]
+    grid[:region.shape[0], :region.shape[1]] = region
+
+    tiles = grid.reshape(rows, step_h, columns, step_w, 4)[:, :tile_h, :, :tile_w]
+    return np.ascontiguousarray(tiles.transpose(0, 2, 1, 3, 4).reshape(-1, tile_h, tile_w, 4))
+
+
+def trim_bounds(frames: np.ndarray) -> np.ndarray:
+    """
+    Находит alpha bounding box для всех кадров сразу
+
+    Args:
+        frames: (N, H, W, 4) uint8
+
+    Returns:
+        (N, 4) массив [x, y, w, h]; пустые кадры получают 1×1 в точке (0, 0)
+    """
+    opaque = frames[..., 3] > 0
+    rows_any = opaque.any(axis=2)
+    cols_any = opaque.any(axis=1)
+    height, width = opaque.shape[1:]
+
+    top = rows_any.argmax(axis=1)
+    bottom = height - rows_any[:, ::-1].argmax(axis=1)
+    left = cols_any.argmax(axis=1)
+    right = width - cols_any[:, ::-1].argmax(axis=1)
+
+    bounds = np.stack([left, top, right - left, bottom - top], axis=1)
+    empty = ~rows_any.any(axis=1)
+    bounds[empty] = (0, 0, 1, 1)
+    return bounds
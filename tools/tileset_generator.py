@@ -6,9 +6,9 @@ Tileset Generator - Автоматическое создание .tsx файл
 
 import sys
 import os
+from io import StringIO
 from pathlib import Path
-from xml.etree.ElementTree import Element, SubElement, ElementTree, tostring
-from xml.dom import minidom
+from xml.sax.saxutils import escape
 
 try:
     from PIL import Image
@@ -17,43 +17,432 @@ except ImportError:
     print("Установите: pip3 install Pillow")
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Ошибка: библиотека numpy не установлена")
+    print("Установите: pip3 install numpy")
+    sys.exit(1)
 
-def prettify_xml(elem):
-    """Форматирует XML для читаемости"""
-    rough_string = tostring(elem, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ", encoding="utf-8").decode('utf-8')
+from tile_utils import slice_tiles, trim_bounds
 
 
-def generate_tileset(png_path, output_path=None, tile_width=16, tile_height=16,
-                     spacing=0, margin=0, name=None):
+# Ограничения перебора для --auto
+AUTO_MIN_TILE = 4
+AUTO_MAX_TILE = 512
+AUTO_MAX_SPACING = 8
+AUTO_MAX_MARGIN = 8
+
+# Сколько строк/столбцов берём для оценки контраста на границах тайлов
+AUTO_SAMPLE_LINES = 256
+
+# Сетка принимается, если её разрезы хороши чаще случайных линий хотя бы
+# на AUTO_MIN_EVIDENCE стандартных отклонений; полная уверенность - при
+# отрыве от ближайшей другой сетки на AUTO_SEPARATION
+AUTO_MIN_EVIDENCE = 2.0
+AUTO_SEPARATION = 3.0
+
+# Ниже этой уверенности --auto не записывает .tsx
+AUTO_LOW_CONFIDENCE = 0.5
+
+# Больше цветов палитра PNG не вмещает
+PALETTE_MAX_COLORS = 256
+
+
+# Экранирование значений атрибутов XML (кавычки и переводы строк)
+XML_ATTR_ENTITIES = {'"': '&quot;', '\n': '&#10;', '\r': '&#13;', '\t': '&#9;'}
+
+
+def xml_attrs(attrs):
+    """Сериализует атрибуты в строку вида ' name="value"'"""
+    return ''.join(f' {key}="{escape(str(value), XML_ATTR_ENTITIES)}"' for key, value in attrs.items())
+
+
+def compute_tile_metadata(pixels, tile_width, tile_height, spacing=0, margin=0):
     """
-    Генерирует .tsx файл из PNG изображения
+    Считает метаданные всех тайлов изображения за один векторный проход
 
     Args:
-        png_path: путь к PNG файлу
-        output_path: путь для сохранения .tsx (если None, заменит расширение на .tsx)
-        tile_width: ширина одного тайла в пикселях
-        tile_height: высота одного тайла в пикселях
-        spacing: отступ между тайлами
-        margin: отступ от края изображения
-        name: имя tileset (если None, используется имя файла)
+        pixels: RGBA массив (H, W, 4) uint8
+        остальные параметры - сетка tileset
+
+    Returns:
+        словарь массивов по тайлам: empty, opaque, bounds (x, y, w, h по альфе)
+        и color (средний цвет RGBA; цвет усредняется с весом по альфе)
+    """
+    tiles = slice_tiles(pixels, tile_width, tile_height, spacing, margin)
+    count = len(tiles)
+    alpha = tiles[..., 3].reshape(count, -1)
+    rgb = tiles[..., :3].reshape(count, -1, 3)
+
+    alpha_sum = alpha.sum(axis=1, dtype=np.int64)
+    # Произведение канала на альфу помещается в uint32, сумма по тайлу - в uint64
+    alpha32 = alpha.astype(np.uint32)
+    weighted = np.stack([(rgb[..., channel] * alpha32).sum(axis=1, dtype=np.uint64)
+                         for channel in range(3)], axis=1)
+
+    color = np.empty((count, 4), dtype=np.uint8)
+    color[:, :3] = np.rint(weighted / np.maximum(alpha_sum, 1)[:, None])
+    color[:, 3] = np.rint(alpha_sum / alpha.shape[1])
+
+    return {
+        'empty': alpha_sum == 0,
+        'opaque': alpha.min(axis=1) == 255,
+        'bounds': trim_bounds(tiles),
+        'color': color
+    }
+
+
+def write_tile_entries(out, metadata):
+    """
+    Пишет элементы <tile> с флагами empty/opaque, средним цветом
+    и объектом коллизии по alpha bounding box (для непустых тайлов)
+    """
+    flags = ('false', 'true')
+    empty = metadata['empty'].tolist()
+    opaque = metadata['opaque'].tolist()
+    bounds = metadata['bounds'].tolist()
+    colors = ['#%02x%02x%02x%02x' % (a, r, g, b) for r, g, b, a in metadata['color'].tolist()]
+
+    for tile_id in range(len(empty)):
+        out.write(f'  <tile id="{tile_id}">\n'
+                  f'    <properties>\n'
+                  f'      <property name="empty" type="bool" value="{flags[empty[tile_id]]}"/>\n'
+                  f'      <property name="opaque" type="bool" value="{flags[opaque[tile_id]]}"/>\n')
+        if empty[tile_id]:
+            out.write('    </properties>\n  </tile>\n')
+            continue
+
+        x, y, w, h = bounds[tile_id]
+        out.write(f'      <property name="average_color" type="color" value="{colors[tile_id]}"/>\n'
+                  f'    </properties>\n'
+                  f'    <objectgroup draworder="index" id="2">\n'
+                  f'      <object id="1" x="{x}" y="{y}" width="{w}" height="{h}"/>\n'
+                  f'    </objectgroup>\n'
+                  f'  </tile>\n')
+
+
+def _empty_mask(pixels):
+    """
+    Маска "пустых" пикселей: прозрачные, а если прозрачности нет -
+    совпадающие с цветом фона (самый частый цвет по краю изображения)
+    """
+    alpha = pixels[..., 3]
+    if (alpha == 0).any():
+        return alpha == 0
+
+    packed = np.ascontiguousarray(pixels).view(np.uint32)[..., 0]
+    border = np.concatenate([packed[0], packed[-1], packed[:, 0], packed[:, -1]])
+    colors, counts = np.unique(border, return_counts=True)
+    return packed == colors[counts.argmax()]
+
+
+def _edge_profile(pixels, axis):
+    """
+    Средний перепад цвета между соседними столбцами (axis=1) или строками (axis=0)
+
+    profile[i] - перепад между линиями i-1 и i; считается по равномерной выборке
+    линий поперёк оси, чтобы не проходить по всему изображению.
+    """
+    other = 1 - axis
+    step = max(1, pixels.shape[other] // AUTO_SAMPLE_LINES)
+    sample = pixels[::step] if other == 0 else pixels[:, ::step]
+
+    # Цвет под прозрачными пикселями не должен влиять на перепады
+    sample = sample[..., :3].astype(np.int16) * (sample[..., 3:4] > 0)
+
+    diff = np.abs(np.diff(sample, axis=axis)).mean(axis=(other, 2))
+    return np.concatenate([[0.0], diff])
+
+
+def _detect_axis(emptiness, edges, fixed=None):
+    """
+    Подбирает (tile, spacing, margin) вдоль одной оси
+
+    Сетка из двух и более тайлов подходит, если margin, все промежутки и
+    остаток после последнего тайла пусты (остаток меньше шага: Tiled считает
+    тайлы с округлением вниз). Разрез без spacing хорош, если рядом пустая
+    линия, резкий перепад цвета или пик доли пустых пикселей. Оценка -
+    насколько чаще случайных линий разрезы сетки оказываются хорошими
+    (z-оценка биномиального распределения). Первый промежуток не считается:
+    размер тайла подбирается перебором и всегда может попасть в пустую
+    полосу. "Один тайл на всю ось" получает AUTO_MIN_EVIDENCE. Сетки,
+    разрезы которых попадают в одни и те же серии пустых линий, режут
+    одинаково: из них берётся та, к промежуткам которой вплотную примыкают
+    тайлы, затем с меньшим остатком. Уверенность - отрыв от ближайшей
+    другой сетки.
+
+    Args:
+        emptiness: доля пустых пикселей в каждой линии вдоль оси
+        edges: профиль перепадов цвета (_edge_profile)
+        fixed: (spacing, margin), если они уже известны по другой оси
+
+    Returns:
+        (tile, spacing, margin, confidence, shortest); shortest - None для
+        сетки, а для одного тайла - его наименьший размер, при котором
+        содержимое ещё помещается (меньше tile, если в конце пустой хвост)
+    """
+    length = len(emptiness)
+    empty = emptiness >= 1.0
+
+    def peaks(profile):
+        # Линии, где профиль выше медианы, не ниже соседних и строго выше
+        # линий через одну (ровное плато - не граница)
+        near = np.maximum(np.roll(profile, 1), np.roll(profile, -1))
+        far = np.maximum(np.roll(profile, 2), np.roll(profile, -2))
+        return (profile > np.median(profile) + 1e-6) & (profile >= near) & (profile > far)
+
+    # Граница тайлов - резкий перепад цвета или пик пустоты: прозрачные поля
+    # объектов по обе стороны разреза (поля неровные, поэтому допуск ±1 линия)
+    sharp = peaks(edges) & (edges > 2.0 * np.median(edges))
+    sparse = peaks(np.concatenate([[0.0], emptiness[:-1] + emptiness[1:]]))
+    sparse = sparse | np.roll(sparse, 1) | np.roll(sparse, -1)
+    cut_good = np.zeros(length, dtype=bool)
+    cut_good[1:] = empty[:-1] | empty[1:] | sharp[1:] | sparse[1:]
+
+    # Пустота отрезка [a, b) проверяется по накопленной сумме за O(1)
+    filled = np.concatenate([[0], np.cumsum(~empty)])
+    lead = int(np.argmax(~empty)) if filled[-1] else length
+    tail = length - int(np.argmax(~empty[::-1])) if filled[-1] else 0
+    # Номер серии пустых линий, в которую попадает линия (0 - не пустая)
+    run_id = np.where(empty, np.cumsum(empty & ~np.concatenate([[False], empty[:-1]])), 0)
+
+    def evidence(good, chance):
+        # Без проверяемых разрезов сетка не хуже и не лучше одного тайла
+        if not good.size:
+            return AUTO_MIN_EVIDENCE
+        chance = min(max(chance, 0.01), 0.99)
+        return (good.sum() - good.size * chance) / np.sqrt(good.size * chance * (1.0 - chance))
+
+    spacing, margin = fixed or (0, 0)
+    # (оценка, tile, spacing, margin, прилегание к промежуткам, серии пустых
+    #  линий на разрезах, остаток после последнего тайла, хорошие разрезы, их вероятность)
+    candidates = [(AUTO_MIN_EVIDENCE, length - 2 * margin, spacing, margin, 0.5, None, margin,
+                   np.empty(0, dtype=bool), 0.0)]
+
+    spacings = [fixed[0]] if fixed else range(AUTO_MAX_SPACING + 1)
+    margins = [fixed[1]] if fixed else range(min(lead, AUTO_MAX_MARGIN) + 1)
+
+    for spacing in spacings:
+        # Вероятность, что случайный разрез хорош: пустой промежуток или хорошая линия
+        chance = (filled[spacing:] == filled[:length + 1 - spacing]).mean() if spacing else cut_good.mean()
+        for margin in margins:
+            # Margin пуст, а без spacing ещё и вплотную примыкает к содержимому
+            if margin > lead or (margin and not spacing and margin != lead):
+                continue
+            for tile in range(AUTO_MIN_TILE, AUTO_MAX_TILE + 1):
+                step = tile + spacing
+                count = (length - 2 * margin + spacing) // step
+                if count < 2:
+                    break
+                if margin + count * step - spacing < tail:
+                    continue
+                if spacing and filled[margin + tile + spacing] != filled[margin + tile]:
+                    continue
+
+                cuts = margin + tile + np.arange(count - 1) * step
+                if spacing:
+                    if (filled[cuts + spacing] != filled[cuts]).any():
+                        continue
+                    good = np.ones(count - 1, dtype=bool)
+                    touching = np.sum(~empty[cuts - 1]) + np.sum(~empty[cuts + spacing])
+                    tight = (touching + 1.0) / (2.0 * count)
+                    runs = run_id[cuts]
+                else:
+                    good = cut_good[cuts]
+                    tight = 0.5
+                    runs = np.maximum(run_id[cuts - 1], run_id[cuts])
+                runs = np.where(runs > 0, runs, -cuts).tobytes()
+                remainder = length - (margin + count * step - spacing)
+                candidates.append((evidence(good[1:] if spacing else good, chance), tile, spacing,
+                                   margin, tight, runs, remainder, good, chance))
+
+    def same_cuts(a, b):
+        return a[5] == b[5]
+
+    # Такие сетки различаются только положением границы внутри пустых серий
+    best = max(candidates, key=lambda c: (c[0], -c[2], -c[3]))
+    score = best[0]
+    same = [c for c in candidates if same_cuts(c, best)]
+    best = max(same, key=lambda c: (c[4], -c[6], -c[2], -c[3]))
+
+    def rival(c):
+        # У мелкой сетки, вложенной в выбранную, часть разрезов совпадает с
+        # настоящими, поэтому она сравнивается только по остальным разрезам
+        step, best_step = c[1] + c[2], best[1] + best[2]
+        if c[7].size > 1 and step < best_step and best_step % step == 0:
+            extra = np.arange(1, c[7].size + 1) % (best_step // step) != 0
+            return score - AUTO_MIN_EVIDENCE + evidence(c[7][extra], c[8])
+        return c[0]
+
+    rivals = [rival(c) for c in candidates if not same_cuts(c, best)]
+    confidence = min(1.0, max(0.0, (score - max(rivals, default=-np.inf)) / AUTO_SEPARATION))
+    # Если та же нарезка читается и без spacing, промежутки должны быть явно
+    # плотными или явно нет; тайлы с одинаковыми прозрачными полями со всех
+    # сторон (spacing = 2 * margin) по пикселям от промежутков не отличить
+    if any(not c[2] for c in same) and any(c[2] for c in same):
+        confidence *= abs(2.0 * max(c[4] for c in same if c[2]) - 1.0)
+        if best[2] and best[2] == 2 * best[3]:
+            confidence = 0.0
+
+    shortest = max(tail - best[3], 1) if best[5] is None else None
+    return best[1], best[2], best[3], confidence, shortest
+
+
+def detect_grid(png_path):
     """
+    Определяет размер тайла, spacing и margin по пикселям изображения
+
+    Анализирует проекции строк и столбцов: периодические пустые промежутки
+    (по альфе или цвету фона) и контраст цвета на границах тайлов.
+
+    Returns:
+        словарь tile_width / tile_height / spacing / margin / confidence (0..1)
+    """
+    with Image.open(png_path) as img:
+        pixels = np.asarray(img.convert('RGBA'))
+
+    empty = _empty_mask(pixels)
+    column_emptiness = empty.mean(axis=0)
+    row_emptiness = empty.mean(axis=1)
+    column_edges = _edge_profile(pixels, axis=1)
+    row_edges = _edge_profile(pixels, axis=0)
+
+    x = _detect_axis(column_emptiness, column_edges)
+    y = _detect_axis(row_emptiness, row_edges)
+
+    # Tiled хранит один spacing и один margin на обе оси:
+    # при расхождении менее уверенная ось подстраивается под более уверенную,
+    # а ось из одного тайла о spacing ничего не знает и подстраивается всегда
+    if x[1:3] != y[1:3]:
+        if y[4] is not None or (x[4] is None and x[3] >= y[3]):
+            y = _detect_axis(row_emptiness, row_edges, fixed=x[1:3])
+        else:
+            x = _detect_axis(column_emptiness, column_edges, fixed=y[1:3])
+
+    # Ряд в один тайл: его размер известен лишь до пустого хвоста - если в
+    # этот диапазон попадает тайл другой оси, берём его, иначе размер угадан
+    if x[4] is not None and x[4] < x[0]:
+        x = (y[0],) + x[1:] if x[4] <= y[0] <= x[0] else x[:3] + (0.0,) + x[4:]
+    if y[4] is not None and y[4] < y[0]:
+        y = (x[0],) + y[1:] if y[4] <= x[0] <= y[0] else y[:3] + (0.0,) + y[4:]
+
+    confidence = min(x[3], y[3])
+
+    return {
+        'tile_width': int(x[0]),
+        'tile_height': int(y[0]),
+        'spacing': int(x[1]),
+        'margin': int(x[2]),
+        'confidence': round(float(confidence), 2)
+    }
+
+
+def pack_colors(pixels):
+    """
+    Упаковывает RGBA пиксели в uint32 вида 0xRRGGBBAA
+
+    Полностью прозрачные пиксели сводятся к 0: их RGB не виден
+    и не должен занимать места в палитре.
+    """
+    packed = np.ascontiguousarray(pixels).view('>u4')[..., 0].astype(np.uint32)
+    packed[pixels[..., 3] == 0] = 0
+    return packed
+
 
+def sheet_colors(png_path):
+    """Уникальные цвета изображения (отсортированный массив pack_colors)"""
+    with Image.open(png_path) as img:
+        return np.unique(pack_colors(np.asarray(img.convert('RGBA'))))
+
+
+def build_palette(color_sets):
+    """
+    Объединяет наборы цветов листов в одну палитру
+
+    Returns:
+        отсортированный массив цветов или None, если их больше PALETTE_MAX_COLORS
+    """
+    palette = np.unique(np.concatenate(color_sets))
+    return palette if len(palette) <= PALETTE_MAX_COLORS else None
+
+
+def palette_to_string(palette):
+    """Палитра в формате цветов Tiled: "#aarrggbb,#aarrggbb,..." """
+    argb = (palette >> 8) | ((palette & 0xFF) << 24)
+    return ','.join('#%08x' % color for color in argb.tolist())
+
+
+def export_indexed(png_path, palette, output_dir):
+    """
+    Сохраняет лист как индексированный PNG и lossless WebP без потери цветов
+
+    Args:
+        png_path: исходный лист
+        palette: палитра (build_palette), должна содержать все цвета листа
+        output_dir: куда писать <имя>_indexed.png и <имя>_indexed.webp
+
+    Returns:
+        словарь с путями и размерами файлов или None, если в листе есть цвета вне палитры
+    """
     png_path = Path(png_path)
+    output_dir = Path(output_dir)
 
-    if not png_path.exists():
-        print(f"❌ Файл не найден: {png_path}")
-        return False
+    with Image.open(png_path) as img:
+        packed = pack_colors(np.asarray(img.convert('RGBA')))
 
-    # Открываем изображение для получения размеров
-    try:
-        img = Image.open(png_path)
+    indices = np.minimum(np.searchsorted(palette, packed), len(palette) - 1)
+    if not np.array_equal(palette[indices], packed):
+        return None
+
+    rgba = palette.astype('>u4').view(np.uint8).reshape(-1, 4)
+
+    indexed = Image.fromarray(indices.astype(np.uint8), 'P')
+    indexed.putpalette(rgba[:, :3].tobytes())
+    save_kwargs = {'optimize': True}
+    if (rgba[:, 3] < 255).any():
+        save_kwargs['transparency'] = rgba[:, 3].tobytes()
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    indexed_path = output_dir / f"{png_path.stem}_indexed.png"
+    webp_path = output_dir / f"{png_path.stem}_indexed.webp"
+
+    indexed.save(indexed_path, **save_kwargs)
+    Image.fromarray(rgba[indices], 'RGBA').save(webp_path, 'WEBP', lossless=True, quality=100, method=6)
+
+    return {
+        'indexed_path': indexed_path,
+        'webp_path': webp_path,
+        'source_bytes': png_path.stat().st_size,
+        'indexed_bytes': indexed_path.stat().st_size,
+        'webp_bytes': webp_path.stat().st_size
+    }
+
+
+def build_tileset_xml(png_path, output_path, tile_width=16, tile_height=16,
+                      spacing=0, margin=0, name=None, metadata=True, properties=None):
+    """
+    Строит содержимое .tsx файла для PNG изображения (без записи на диск)
+
+    XML пишется за один проход, без промежуточного дерева элементов.
+
+    Args:
+        png_path: путь к PNG файлу
+        output_path: где будет лежать .tsx (от него считается относительный путь к PNG)
+        metadata: добавить элементы <tile> с метаданными тайлов
+        properties: свойства tileset - список (имя, тип Tiled, значение)
+        остальные параметры - как в generate_tileset
+
+    Returns:
+        (xml_string, info) где info - словарь с размерами и количеством тайлов
+    """
+    png_path = Path(png_path)
+    output_path = Path(output_path)
+
+    # Открываем изображение: для метаданных нужны пиксели, иначе - только размеры
+    with Image.open(png_path) as img:
         img_width, img_height = img.size
-        img.close()
-    except Exception as e:
-        print(f"❌ Ошибка при открытии изображения: {e}")
-        return False
+        pixels = np.asarray(img.convert('RGBA')) if metadata else None
 
     # Вычисляем количество тайлов
     columns = (img_width - 2 * margin + spacing) // (tile_width + spacing)
@@ -64,12 +453,6 @@ def generate_tileset(png_path, output_path=None, tile_width=16, tile_height=16,
     if name is None:
         name = png_path.stem
 
-    # Определяем путь для сохранения
-    if output_path is None:
-        output_path = png_path.with_suffix('.tsx')
-    else:
-        output_path = Path(output_path)
-
     # Относительный путь к PNG от .tsx файла
     try:
         relative_png = os.path.relpath(png_path, output_path.parent)
@@ -77,34 +460,154 @@ def generate_tileset(png_path, output_path=None, tile_width=16, tile_height=16,
         # На Windows, если файлы на разных дисках
         relative_png = str(png_path)
 
-    # Создаем XML структуру
-    tileset = Element('tileset', {
+    tileset_attrs = {
         'version': '1.10',
         'tiledversion': '1.10.2',
         'name': name,
-        'tilewidth': str(tile_width),
-        'tileheight': str(tile_height),
-        'tilecount': str(tile_count),
-        'columns': str(columns)
-    })
+        'tilewidth': tile_width,
+        'tileheight': tile_height,
+        'tilecount': tile_count,
+        'columns': columns
+    }
 
     if spacing > 0:
-        tileset.set('spacing', str(spacing))
+        tileset_attrs['spacing'] = spacing
     if margin > 0:
-        tileset.set('margin', str(margin))
+        tileset_attrs['margin'] = margin
 
-    # Добавляем изображение
-    image = SubElement(tileset, 'image', {
+    image_attrs = {
         'source': relative_png,
-        'width': str(img_width),
-        'height': str(img_height)
-    })
+        'width': img_width,
+        'height': img_height
+    }
 
-    # Форматируем и сохраняем
-    xml_string = prettify_xml(tileset)
+    out = StringIO()
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write(f'<tileset{xml_attrs(tileset_attrs)}>\n')
+
+    if properties:
+        out.write('  <properties>\n')
+        for prop_name, prop_type, value in properties:
+            # string - тип по умолчанию, Tiled его не пишет
+            prop_attrs = {'name': prop_name}
+            if prop_type != 'string':
+                prop_attrs['type'] = prop_type
+            prop_attrs['value'] = value
+            out.write(f'    <property{xml_attrs(prop_attrs)}/>\n')
+        out.write('  </properties>\n')
+
+    out.write(f'  <image{xml_attrs(image_attrs)}/>\n')
+
+    empty_tiles = None
+    if metadata and tile_count > 0:
+        tile_metadata = compute_tile_metadata(pixels, tile_width, tile_height, spacing, margin)
+        write_tile_entries(out, tile_metadata)
+        empty_tiles = int(tile_metadata['empty'].sum())
+
+    out.write('</tileset>\n')
+
+    info = {
+        'width': img_width,
+        'height': img_height,
+        'columns': columns,
+        'rows': rows,
+        'tile_count': tile_count,
+        'empty_tiles': empty_tiles
+    }
+
+    return out.getvalue(), info
 
-    # Добавляем XML declaration вручную
-    xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + '\n'.join(xml_string.split('\n')[1:])
+
+def generate_tileset(png_path, output_path=None, tile_width=16, tile_height=16,
+                     spacing=0, margin=0, name=None, auto=False, auto_fallback=False, metadata=True,
+                     indexed=False, palette=None):
+    """
+    Генерирует .tsx файл из PNG изображения
+
+    Args:
+        png_path: путь к PNG файлу
+        output_path: путь для сохранения .tsx (если None, заменит расширение на .tsx)
+        tile_width: ширина одного тайла в пикселях
+        tile_height: высота одного тайла в пикселях
+        spacing: отступ между тайлами
+        margin: отступ от края изображения
+        name: имя tileset (если None, используется имя файла)
+        auto: определить размер тайла, spacing и margin по изображению
+        auto_fallback: при низкой уверенности auto взять заданную сетку, а не отказаться
+        metadata: записать метаданные тайлов (empty/opaque, средний цвет, коллизия)
+        indexed: сохранить рядом индексированный PNG и WebP, а палитру записать в .tsx
+        palette: общая палитра пакета (если None, палитра строится по самому листу)
+    """
+
+    png_path = Path(png_path)
+
+    if not png_path.exists():
+        print(f"❌ Файл не найден: {png_path}")
+        return False
+
+    if auto:
+        try:
+            grid = detect_grid(png_path)
+        except Exception as e:
+            print(f"❌ Ошибка при анализе изображения: {e}")
+            return False
+
+        print(f"🔎 {png_path.name}: сетка {grid['tile_width']}x{grid['tile_height']}px, "
+              f"spacing {grid['spacing']}, margin {grid['margin']} "
+              f"(уверенность {grid['confidence']:.2f})")
+
+        if grid['confidence'] >= AUTO_LOW_CONFIDENCE:
+            tile_width = grid['tile_width']
+            tile_height = grid['tile_height']
+            spacing = grid['spacing']
+            margin = grid['margin']
+        elif auto_fallback:
+            print(f"   ⚠️  Низкая уверенность - используется заданная сетка "
+                  f"{tile_width}x{tile_height}px, spacing {spacing}, margin {margin}")
+        else:
+            print("   ❌ Низкая уверенность - .tsx не записан, задайте сетку вручную "
+                  "(--tile-size, --spacing, --margin)")
+            return False
+
+    # Определяем путь для сохранения
+    if output_path is None:
+        output_path = png_path.with_suffix('.tsx')
+    else:
+        output_path = Path(output_path)
+
+    properties = None
+    export = None
+    if indexed:
+        try:
+            if palette is None:
+                colors = sheet_colors(png_path)
+                print(f"🎨 {png_path.name}: цветов {len(colors)}")
+                palette = build_palette([colors])
+
+            if palette is None:
+                print(f"   ⚠️  Больше {PALETTE_MAX_COLORS} цветов - индексированная версия не создаётся")
+            else:
+                export = export_indexed(png_path, palette, output_path.parent)
+                if export is None:
+                    print("   ⚠️  В листе есть цвета вне общей палитры - индексированная версия не создаётся")
+        except Exception as e:
+            print(f"❌ Ошибка при экспорте палитры: {e}")
+            return False
+
+    if export:
+        properties = [
+            ('palette', 'string', palette_to_string(palette)),
+            ('palette_size', 'int', len(palette)),
+            ('indexed_image', 'file', export['indexed_path'].name),
+            ('webp_image', 'file', export['webp_path'].name)
+        ]
+
+    try:
+        xml_string, info = build_tileset_xml(png_path, output_path, tile_width, tile_height,
+                                             spacing, margin, name, metadata, properties)
+    except Exception as e:
+        print(f"❌ Ошибка при открытии изображения: {e}")
+        return False
 
     try:
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -112,9 +615,18 @@ def generate_tileset(png_path, output_path=None, tile_width=16, tile_height=16,
             f.write(xml_string)
 
         print(f"✅ Создан tileset: {output_path}")
-        print(f"   📐 Размер изображения: {img_width}x{img_height}px")
+        print(f"   📐 Размер изображения: {info['width']}x{info['height']}px")
         print(f"   🎯 Размер тайла: {tile_width}x{tile_height}px")
-        print(f"   📊 Количество тайлов: {tile_count} ({columns} колонок × {rows} строк)")
+        print(f"   📊 Количество тайлов: {info['tile_count']} ({info['columns']} колонок × {info['rows']} строк)")
+        if info['empty_tiles'] is not None:
+            print(f"   🧱 Метаданные тайлов: пустых {info['empty_tiles']}, с содержимым {info['tile_count'] - info['empty_tiles']}")
+        if export:
+            source = export['source_bytes']
+            print(f"   🎨 Палитра: {len(palette)} цветов")
+            for label, key in (('indexed PNG', 'indexed_bytes'), ('WebP', 'webp_bytes')):
+                saved = source - export[key]
+                print(f"   💾 {label}: {source:,} → {export[key]:,} байт "
+                      f"(сэкономлено {saved:,}, {saved * 100 / max(source, 1):.1f}%)")
 
         return True
 
@@ -138,7 +650,8 @@ def process_directory(directory, output_dir=None, **kwargs):
         print(f"❌ Директория не найдена: {directory}")
         return
 
-    png_files = list(directory.glob('*.png'))
+    # Результаты --indexed лежат рядом с исходниками - это не новые листы
+    png_files = [p for p in directory.glob('*.png') if not p.stem.endswith('_indexed')]
 
     if not png_files:
         print(f"⚠️  PNG файлы не найдены в {directory}")
@@ -147,6 +660,35 @@ def process_directory(directory, output_dir=None, **kwargs):
     print(f"\n🔍 Найдено {len(png_files)} PNG файлов в {directory}")
     print("=" * 60)
 
+    # Палитра считается один раз на весь пакет: цвета каждого листа собираются
+    # однократно, и если объединение листов, помещающихся в PNG палитру, тоже
+    # помещается в неё - палитра у них общая. Листы с большим числом цветов
+    # в объединение не входят и получают .tsx без индексированной версии
+    palettes = {}
+    if kwargs.get('indexed'):
+        color_sets = {}
+        for png_file in png_files:
+            try:
+                color_sets[png_file] = sheet_colors(png_file)
+            except Exception as e:
+                print(f"⚠️  {png_file.name}: не удалось прочитать цвета ({e})")
+
+        for png_file, colors in color_sets.items():
+            print(f"🎨 {png_file.name}: цветов {len(colors)}")
+            if len(colors) > PALETTE_MAX_COLORS:
+                print(f"   ⚠️  Больше {PALETTE_MAX_COLORS} цветов - без индексированной версии")
+                palettes[png_file] = None
+
+        fitting = {png_file: colors for png_file, colors in color_sets.items() if png_file not in palettes}
+        shared = build_palette(list(fitting.values())) if fitting else None
+        if shared is not None:
+            print(f"✅ Общая палитра: {len(shared)} цветов на {len(fitting)} листов")
+            palettes.update(dict.fromkeys(fitting, shared))
+        elif fitting:
+            print(f"⚠️  Общая палитра не помещается в {PALETTE_MAX_COLORS} цветов - палитры по листам")
+            palettes.update({png_file: build_palette([colors]) for png_file, colors in fitting.items()})
+        print()
+
     success_count = 0
 
     for png_file in png_files:
@@ -155,7 +697,13 @@ def process_directory(directory, output_dir=None, **kwargs):
         else:
             output_path = None
 
-        if generate_tileset(png_file, output_path, **kwargs):
+        file_kwargs = dict(kwargs)
+        if png_file in palettes:
+            if palettes[png_file] is None:
+                file_kwargs['indexed'] = False
+            file_kwargs['palette'] = palettes[png_file]
+
+        if generate_tileset(png_file, output_path, **file_kwargs):
             success_count += 1
         print()
 
@@ -175,6 +723,7 @@ def main():
   python3 tileset_generator.py <директория>                    # Обработать все PNG в директории
   python3 tileset_generator.py <PNG> --output <путь_к_TSX>    # Указать путь для сохранения
   python3 tileset_generator.py <PNG> --tile-size 32           # Изменить размер тайла
+  python3 tileset_generator.py <PNG> --auto                   # Определить сетку по изображению
 
 Параметры:
   --output, -o         Путь для сохранения .tsx файла
@@ -184,6 +733,10 @@ def main():
   --spacing            Отступ между тайлами
   --margin             Отступ от края изображения
   --name, -n           Имя tileset
+  --auto               Определить размер тайла, spacing и margin автоматически
+                       (при низкой уверенности .tsx не пишется, если сетка не задана вручную)
+  --no-metadata        Не записывать метаданные тайлов (<tile>: empty/opaque, цвет, коллизия)
+  --indexed            Сохранить индексированный PNG и WebP (до 256 цветов, палитра общая для папки)
 
 Примеры:
   # Создать .tsx для одного файла
@@ -194,6 +747,12 @@ def main():
 
   # Создать tileset с размером тайла 32x32
   python3 tileset_generator.py my_tiles.png --tile-size 32
+
+  # Определить сетку для каждого PNG в папке
+  python3 tileset_generator.py public/assets/tilesets/ --auto
+
+  # Индексированные PNG + WebP с общей палитрой для всех листов
+  python3 tileset_generator.py public/assets/tilesets/ --indexed
 """)
         sys.exit(0)
 
@@ -206,13 +765,21 @@ def main():
         'spacing': 0,
         'margin': 0,
         'name': None,
-        'output_path': None
+        'output_path': None,
+        'auto': False,
+        'auto_fallback': False,
+        'metadata': True,
+        'indexed': False
     }
 
     i = 2
     while i < len(sys.argv):
         arg = sys.argv[i]
 
+        # Сетка, заданная вручную, - запасной вариант для --auto
+        if arg in ['--tile-size', '--tile-width', '--tile-height', '--spacing', '--margin']:
+            kwargs['auto_fallback'] = True
+
         if arg in ['--output', '-o'] and i + 1 < len(sys.argv):
             kwargs['output_path'] = sys.argv[i + 1]
             i += 2
@@ -236,6 +803,15 @@ def main():
         elif arg in ['--name', '-n'] and i + 1 < len(sys.argv):
             kwargs['name'] = sys.argv[i + 1]
             i += 2
+        elif arg == '--auto':
+            kwargs['auto'] = True
+            i += 1
+        elif arg == '--no-metadata':
+            kwargs['metadata'] = False
+            i += 1
+        elif arg == '--indexed':
+            kwargs['indexed'] = True
+            i += 1
         else:
             i += 1
 
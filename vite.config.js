@@ -4,7 +4,14 @@ export default defineConfig({
     base: '/karina-birthday/',
     server: {
         port: 3000,
-        open: true
+        open: true,
+        proxy: {
+            // Ассеты, генерируемые на лету: python3 tools/asset_server.py
+            '/dev-assets': {
+                target: 'http://127.0.0.1:8765',
+                rewrite: (path) => path.replace(/^\/dev-assets/, '')
+            }
+        }
     },
     build: {
         outDir: 'dist',